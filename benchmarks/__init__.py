@@ -0,0 +1 @@
+"""Benchmarks that drive the OneDrive helper services against an in-process Graph stand-in."""
@@ -0,0 +1,614 @@
+"""In-process aiohttp stand-in for the Microsoft Graph drive endpoints used by ``GraphClient``.
+
+The server keeps a drive in memory and serves children listings with
+``$skiptoken`` pagination, search, item and path lookups, simple and
+resumable uploads, album bundles, ``$batch`` and delta queries. Every request,
+including each ``$batch`` sub-request, can be delayed, throttled with ``429`` and
+``Retry-After``, or failed with a server error according to a ``FaultProfile``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from aiohttp import web
+
+from onedrive_helper.config import SERVER_ERROR_STATUSES
+from onedrive_helper.quickxor import QuickXorHash
+
+ROOT_ID = "ROOT"
+API_PREFIX = "/v1.0"
+BEARER_TOKEN = "mock-token"
+DEFAULT_PAGE_SIZE = 200
+DELTA_PAGE_SIZE = 1000
+BATCH_LIMIT = 20
+HASH_TYPES = ("sha1", "quickxor")
+# Graph rejects upload-session fragments of 60 MiB or more.
+MAX_FRAGMENT_BYTES = 60 * 1024 * 1024
+MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".heic": "image/heic",
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+}
+
+Response = tuple[int, Any, dict[str, str]]
+
+
+class AccessToken(NamedTuple):
+    """Token shape returned by ``azure.identity`` credentials."""
+
+    token: str
+    expires_on: int
+
+
+class StaticCredential:  # pylint: disable=too-few-public-methods
+    """Credential stand-in that hands out the mock server's bearer token."""
+
+    def get_token(self, *_scopes: str) -> AccessToken:
+        """Return a token that stays valid for an hour."""
+        return AccessToken(BEARER_TOKEN, int(time.time()) + 3600)
+
+
+@dataclass
+class FaultProfile:
+    """Latency and failures injected into the responses of a ``MockGraphServer``.
+
+    ``latency`` seconds are added to every HTTP request. ``throttle_rate`` and
+    ``error_rate`` are the fractions of requests and ``$batch`` sub-requests that
+    are answered with ``429`` plus ``Retry-After: retry_after``, or with a 5xx
+    status, instead of being served.
+    """
+
+    latency: float = 0.0
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    retry_after: int = 1
+    seed: Optional[int] = None
+
+
+class MockItem:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """A file or folder held by ``MockDrive``; slots keep million-item drives small."""
+
+    __slots__ = ("id", "name", "parent_id", "is_folder", "size", "hashes", "mime_type", "version")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        item_id: str,
+        name: str,
+        parent_id: Optional[str],
+        *,
+        is_folder: bool = False,
+        size: int = 0,
+        hashes: Optional[dict[str, str]] = None,
+    ) -> None:
+        self.id = item_id
+        self.name = name
+        self.parent_id = parent_id
+        self.is_folder = is_folder
+        self.size = size
+        self.hashes = hashes or {}
+        suffix = name[name.rfind(".") :].lower() if "." in name else ""
+        self.mime_type = "" if is_folder else MIME_TYPES.get(suffix, "application/octet-stream")
+        self.version = 0
+
+
+@dataclass
+class MockBundle:
+    """An album and the IDs of the items it holds, in the order they were added."""
+
+    id: str
+    name: str
+    item_ids: list[str] = field(default_factory=list)
+    members: set[str] = field(default_factory=set)
+
+
+def content_hashes(content: bytes, hash_types: tuple[str, ...] = HASH_TYPES) -> dict[str, str]:
+    """Return the Graph ``file.hashes`` facet with the given hash types of some bytes."""
+    hashes: dict[str, str] = {}
+    if "sha1" in hash_types:
+        hashes["sha1Hash"] = hashlib.sha1(content).hexdigest().upper()
+    if "quickxor" in hash_types:
+        hashes["quickXorHash"] = QuickXorHash(content).b64digest()
+    return hashes
+
+
+class MockDrive:
+    """In-memory drive tree whose change counter backs delta tokens."""
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.items: dict[str, MockItem] = {ROOT_ID: MockItem(ROOT_ID, "root", None, is_folder=True)}
+        self.bundles: dict[str, MockBundle] = {}
+        self._children: dict[str, list[str]] = {ROOT_ID: []}
+        self._child_names: dict[str, dict[str, str]] = {ROOT_ID: {}}
+        self._by_name: dict[str, list[str]] = {}
+
+    def _bump(self, item: MockItem) -> None:
+        self.version += 1
+        item.version = self.version
+
+    def _attach(self, item: MockItem) -> MockItem:
+        self._bump(item)
+        self.items[item.id] = item
+        self._children[item.parent_id].append(item.id)
+        self._child_names[item.parent_id][item.name.casefold()] = item.id
+        self._by_name.setdefault(item.name.casefold(), []).append(item.id)
+        if item.is_folder:
+            self._children[item.id] = []
+            self._child_names[item.id] = {}
+        return item
+
+    def child(self, parent_id: str, name: str) -> Optional[MockItem]:
+        """Return the child of a folder with the given name, ignoring case."""
+        item_id = self._child_names.get(parent_id, {}).get(name.casefold())
+        return self.items[item_id] if item_id else None
+
+    def children(self, parent_id: str) -> list[str]:
+        """Return the IDs of a folder's children in creation order."""
+        return self._children[parent_id]
+
+    def is_folder(self, item_id: str) -> bool:
+        """Return whether ``item_id`` names an existing folder."""
+        item = self.items.get(item_id)
+        return item is not None and item.is_folder
+
+    def add_folder(self, parent_id: str, name: str) -> MockItem:
+        """Create a folder below ``parent_id``."""
+        return self._attach(MockItem(uuid.uuid4().hex.upper(), name, parent_id, is_folder=True))
+
+    def ensure_folder(self, path: str) -> MockItem:
+        """Return the folder at a root-relative path, creating missing folders."""
+        folder = self.items[ROOT_ID]
+        for part in (segment for segment in path.split("/") if segment):
+            folder = self.child(folder.id, part) or self.add_folder(folder.id, part)
+        return folder
+
+    def add_file(self, parent_id: str, name: str, *, size: int, hashes: dict[str, str]) -> MockItem:
+        """Create a file below ``parent_id``, replacing the content of an existing one."""
+        existing = self.child(parent_id, name)
+        if existing is not None and not existing.is_folder:
+            existing.size = size
+            existing.hashes = hashes
+            self._bump(existing)
+            return existing
+        return self._attach(
+            MockItem(uuid.uuid4().hex.upper(), name, parent_id, size=size, hashes=hashes)
+        )
+
+    def add_bundle(self, name: str) -> MockBundle:
+        """Create an empty album."""
+        bundle = MockBundle(uuid.uuid4().hex.upper(), name)
+        self.bundles[bundle.id] = bundle
+        return bundle
+
+    def resolve(self, path: str) -> Optional[MockItem]:
+        """Return the item at a root-relative path."""
+        item: Optional[MockItem] = self.items[ROOT_ID]
+        for part in (segment for segment in path.split("/") if segment):
+            if item is None:
+                return None
+            item = self.child(item.id, part)
+        return item
+
+    def search(self, name: str) -> list[str]:
+        """Return the IDs of items whose name equals ``name``, ignoring case."""
+        return self._by_name.get(name.casefold(), [])
+
+    def walk(self, folder_id: str) -> Iterator[MockItem]:
+        """Yield a folder and every item below it, parents before children."""
+        pending = [folder_id]
+        while pending:
+            item = self.items[pending.pop()]
+            yield item
+            if item.is_folder:
+                pending.extend(reversed(self._children[item.id]))
+
+    def folder_path(self, folder: MockItem) -> str:
+        """Return the ``parentReference.path`` that children of ``folder`` carry."""
+        names = []
+        while folder.parent_id is not None:
+            names.append(folder.name)
+            folder = self.items[folder.parent_id]
+        return "/drive/root:" + "".join(f"/{name}" for name in reversed(names))
+
+    def resource(self, item: MockItem) -> dict[str, Any]:
+        """Return the Graph JSON representation of an item."""
+        if item.id == ROOT_ID:
+            return {"id": ROOT_ID, "name": "root", "root": {}, "folder": {"childCount": len(self._children[ROOT_ID])}}
+        data: dict[str, Any] = {
+            "id": item.id,
+            "name": item.name,
+            "size": item.size,
+            "webUrl": f"https://onedrive.mock/{item.id}",
+            "parentReference": {
+                "id": item.parent_id,
+                "path": self.folder_path(self.items[item.parent_id]),
+            },
+        }
+        if item.is_folder:
+            data["folder"] = {"childCount": len(self._children[item.id])}
+        else:
+            data["file"] = {"mimeType": item.mime_type, "hashes": dict(item.hashes)}
+        return data
+
+
+@dataclass
+class _Call:
+    """A request routed to a handler, either sent directly or inside ``$batch``."""
+
+    params: dict[str, str]
+    query: dict[str, str]
+    body: Any
+    headers: dict[str, str]
+    path: str
+
+
+@dataclass
+class _UploadSession:
+    parent_id: str
+    name: str
+    received: int = 0
+    sha1: Any = field(default_factory=hashlib.sha1)
+    quick_xor: QuickXorHash = field(default_factory=QuickXorHash)
+
+
+def _error(status: int, code: str, message: str, headers: Optional[dict[str, str]] = None) -> Response:
+    return status, {"error": {"code": code, "message": message}}, headers or {}
+
+
+def _not_found(what: str = "Item") -> Response:
+    return _error(404, "itemNotFound", f"{what} not found.")
+
+
+class MockGraphServer:  # pylint: disable=too-many-instance-attributes
+    """Serve a ``MockDrive`` over HTTP on a loopback port.
+
+    Pass ``base_url`` to ``GraphClient`` as ``graph_base``. ``requests`` counts
+    HTTP requests by handler and ``operations`` counts the Graph operations they
+    carried, so a ``$batch`` envelope adds one request and one operation per
+    sub-request. Injected faults are counted in ``throttled`` and ``server_errors``.
+    """
+
+    def __init__(self, drive: Optional[MockDrive] = None, faults: Optional[FaultProfile] = None) -> None:
+        self.drive = drive or MockDrive()
+        self.faults = faults or FaultProfile()
+        self.requests: Counter[str] = Counter()
+        self.operations: Counter[str] = Counter()
+        self.throttled = 0
+        self.server_errors = 0
+        self._random = random.Random(self.faults.seed)
+        self._sessions: dict[str, _UploadSession] = {}
+        self._delta_rounds: dict[str, tuple[list[str], int]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._origin = ""
+        item = r"/me/drive/items/(?P<id>[^/:]+)"
+        child = item + r":/(?P<name>[^/:]+)"
+        self._routes: list[tuple[str, re.Pattern[str], Callable[[_Call], Response]]] = [
+            ("GET", re.compile(r"/me/drive/root"), self._get_root),
+            ("GET", re.compile(r"/me/drive/root/children"), self._list_root_children),
+            ("GET", re.compile(r"/me/drive/root/delta"), self._root_delta),
+            ("GET", re.compile(r"/me/drive/root/search\(q='(?P<query>.*)'\)"), self._search),
+            ("GET", re.compile(r"/me/drive/root:/(?P<path>[^:]+)"), self._get_by_path),
+            ("GET", re.compile(item), self._get_item),
+            ("GET", re.compile(item + "/children"), self._list_children),
+            ("POST", re.compile(item + "/children"), self._create_folder),
+            ("GET", re.compile(item + "/delta"), self._item_delta),
+            ("GET", re.compile(child), self._get_child),
+            ("PUT", re.compile(child + ":/content"), self._simple_upload),
+            ("POST", re.compile(child + ":/createUploadSession"), self._create_upload_session),
+            ("PUT", re.compile(r"/upload/(?P<session>[0-9a-f]+)"), self._upload_fragment),
+            ("GET", re.compile(r"/me/drive/bundles"), self._list_bundles),
+            ("POST", re.compile(r"/me/drive/bundles"), self._create_bundle),
+            ("GET", re.compile(r"/me/drive/bundles/(?P<id>[^/]+)/children"), self._list_bundle_children),
+            ("POST", re.compile(r"/me/drive/bundles/(?P<id>[^/]+)/children"), self._add_to_bundle),
+        ]
+        self._binary_handlers = (self._simple_upload, self._upload_fragment)
+
+    @property
+    def base_url(self) -> str:
+        """The API root to use in place of ``GRAPH_BASE``."""
+        return f"{self._origin}{API_PREFIX}"
+
+    @property
+    def total_requests(self) -> int:
+        """Number of HTTP requests served so far."""
+        return sum(self.requests.values())
+
+    @property
+    def total_operations(self) -> int:
+        """Number of Graph operations served so far, counting each ``$batch`` sub-request."""
+        return sum(self.operations.values())
+
+    async def __aenter__(self) -> "MockGraphServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.close()
+
+    async def start(self) -> str:
+        """Listen on a free loopback port and return ``base_url``."""
+        app = web.Application(client_max_size=256 * 1024 * 1024)
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", 0).start()
+        self._origin = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+        return self.base_url
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        if self.faults.latency:
+            await asyncio.sleep(self.faults.latency)
+        url = request.raw_path
+        if url.startswith(API_PREFIX + "/"):
+            url = url[len(API_PREFIX) :]
+        if url == "/$batch" and request.method == "POST":
+            self.requests["batch"] += 1
+            status, payload, headers = self._authorize(request) or self._batch(await request.json())
+        else:
+            status, payload, headers = self._authorize(request) or self._dispatch(
+                request.method,
+                url,
+                await request.read(),
+                dict(request.headers),
+                count_request=True,
+            )
+        if payload is None:
+            return web.Response(status=status, headers=headers)
+        return web.json_response(payload, status=status, headers=headers)
+
+    @staticmethod
+    def _authorize(request: web.Request) -> Optional[Response]:
+        # Upload session URLs are pre-authenticated, like the ones Graph hands out.
+        if request.raw_path.startswith("/upload/"):
+            return None
+        if request.headers.get("Authorization") != f"Bearer {BEARER_TOKEN}":
+            return _error(401, "InvalidAuthenticationToken", "Access token is empty.")
+        return None
+
+    def _inject_fault(self) -> Optional[Response]:
+        roll = self._random.random()
+        if roll < self.faults.throttle_rate:
+            self.throttled += 1
+            return _error(
+                429,
+                "activityLimitReached",
+                "The request has been throttled.",
+                {"Retry-After": str(self.faults.retry_after)},
+            )
+        if roll < self.faults.throttle_rate + self.faults.error_rate:
+            self.server_errors += 1
+            return _error(self._random.choice(SERVER_ERROR_STATUSES), "generalException", "Injected failure.")
+        return None
+
+    def _dispatch(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        body: Any,
+        headers: dict[str, str],
+        *,
+        count_request: bool = False,
+    ) -> Response:
+        parts = urlsplit(url)
+        for route_method, pattern, handler in self._routes:
+            match = pattern.fullmatch(parts.path)
+            if match is None or route_method != method:
+                continue
+            name = handler.__name__.lstrip("_")
+            if count_request:
+                self.requests[name] += 1
+            self.operations[name] += 1
+            fault = self._inject_fault()
+            if fault is not None:
+                return fault
+            if isinstance(body, bytes) and handler not in self._binary_handlers:
+                body = json.loads(body) if body else {}
+            call = _Call(
+                params={key: unquote(value) for key, value in match.groupdict().items()},
+                query=dict(parse_qsl(parts.query, keep_blank_values=True)),
+                body=body,
+                headers=headers,
+                path=parts.path,
+            )
+            return handler(call)
+        if count_request:
+            self.requests["unmatched"] += 1
+        return _error(400, "invalidRequest", f"The mock has no route for {method} {url}.")
+
+    def _batch(self, body: dict[str, Any]) -> Response:
+        requests = body.get("requests", [])
+        if len(requests) > BATCH_LIMIT:
+            return _error(400, "invalidRequest", f"A batch holds at most {BATCH_LIMIT} requests.")
+        responses = []
+        for sub_request in requests:
+            status, payload, headers = self._dispatch(
+                sub_request.get("method", "GET"),
+                sub_request.get("url", ""),
+                sub_request.get("body", {}),
+                sub_request.get("headers", {}),
+            )
+            response: dict[str, Any] = {"id": sub_request.get("id"), "status": status, "headers": headers}
+            if payload is not None:
+                response["body"] = payload
+            responses.append(response)
+        return 200, {"responses": responses}, {}
+
+    def _page(self, call: _Call, item_ids: list[str], resource: Callable[[str], dict[str, Any]]) -> Response:
+        top = int(call.query.get("$top", DEFAULT_PAGE_SIZE))
+        offset = int(call.query.get("$skiptoken", 0))
+        page: dict[str, Any] = {"value": [resource(item_id) for item_id in item_ids[offset : offset + top]]}
+        if offset + top < len(item_ids):
+            next_query = dict(call.query, **{"$top": str(top), "$skiptoken": str(offset + top)})
+            page["@odata.nextLink"] = f"{self.base_url}{call.path}?{urlencode(next_query, safe='$,')}"
+        return 200, page, {}
+
+    def _item_resource(self, item_id: str) -> dict[str, Any]:
+        return self.drive.resource(self.drive.items[item_id])
+
+    def _get_root(self, _call: _Call) -> Response:
+        return 200, self._item_resource(ROOT_ID), {}
+
+    def _list_root_children(self, call: _Call) -> Response:
+        return self._page(call, self.drive.children(ROOT_ID), self._item_resource)
+
+    def _list_children(self, call: _Call) -> Response:
+        if not self.drive.is_folder(call.params["id"]):
+            return _not_found("Folder")
+        return self._page(call, self.drive.children(call.params["id"]), self._item_resource)
+
+    def _search(self, call: _Call) -> Response:
+        name = call.params["query"].replace("''", "'")
+        return 200, {"value": [self._item_resource(item_id) for item_id in self.drive.search(name)]}, {}
+
+    def _get_by_path(self, call: _Call) -> Response:
+        item = self.drive.resolve(call.params["path"])
+        return (200, self.drive.resource(item), {}) if item is not None else _not_found()
+
+    def _get_item(self, call: _Call) -> Response:
+        if call.params["id"] not in self.drive.items:
+            return _not_found()
+        return 200, self._item_resource(call.params["id"]), {}
+
+    def _get_child(self, call: _Call) -> Response:
+        item = self.drive.child(call.params["id"], call.params["name"])
+        return (200, self.drive.resource(item), {}) if item is not None else _not_found()
+
+    def _create_folder(self, call: _Call) -> Response:
+        if not self.drive.is_folder(call.params["id"]):
+            return _not_found("Parent folder")
+        name = call.body.get("name", "")
+        if self.drive.child(call.params["id"], name) is not None:
+            if call.body.get("@microsoft.graph.conflictBehavior", "fail") == "fail":
+                return _error(409, "nameAlreadyExists", f"An item named '{name}' already exists.")
+            name = f"{name} {uuid.uuid4().hex[:6]}"
+        return 201, self.drive.resource(self.drive.add_folder(call.params["id"], name)), {}
+
+    def _simple_upload(self, call: _Call) -> Response:
+        if not self.drive.is_folder(call.params["id"]):
+            return _not_found("Parent folder")
+        item = self.drive.add_file(
+            call.params["id"],
+            call.params["name"],
+            size=len(call.body),
+            hashes=content_hashes(call.body),
+        )
+        return 201, self.drive.resource(item), {}
+
+    def _create_upload_session(self, call: _Call) -> Response:
+        if not self.drive.is_folder(call.params["id"]):
+            return _not_found("Parent folder")
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = _UploadSession(call.params["id"], call.params["name"])
+        return 200, {"uploadUrl": f"{self._origin}/upload/{session_id}"}, {}
+
+    def _upload_fragment(self, call: _Call) -> Response:
+        session = self._sessions.get(call.params["session"])
+        if session is None:
+            return _not_found("Upload session")
+        match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+)", call.headers.get("Content-Range", ""))
+        if match is None or int(match.group(1)) != session.received:
+            return _error(416, "invalidRange", "The fragment does not continue the upload.")
+        start, end, total = (int(value) for value in match.groups())
+        if len(call.body) >= MAX_FRAGMENT_BYTES:
+            return _error(413, "requestTooLarge", "Fragments must be smaller than 60 MiB.")
+        if end - start + 1 != len(call.body):
+            return _error(400, "invalidRange", "The fragment length does not match Content-Range.")
+        session.sha1.update(call.body)
+        session.quick_xor.update(call.body)
+        session.received = end + 1
+        if session.received < total:
+            return 202, {"nextExpectedRanges": [f"{session.received}-"]}, {}
+        del self._sessions[call.params["session"]]
+        hashes = {
+            "sha1Hash": session.sha1.hexdigest().upper(),
+            "quickXorHash": session.quick_xor.b64digest(),
+        }
+        item = self.drive.add_file(session.parent_id, session.name, size=total, hashes=hashes)
+        return 201, self.drive.resource(item), {}
+
+    def _root_delta(self, call: _Call) -> Response:
+        return self._delta(ROOT_ID, call)
+
+    def _item_delta(self, call: _Call) -> Response:
+        if not self.drive.is_folder(call.params["id"]):
+            return _not_found("Folder")
+        return self._delta(call.params["id"], call)
+
+    def _delta(self, folder_id: str, call: _Call) -> Response:
+        """Serve a delta page; a token is the drive version its round ended at."""
+        token = call.query.get("token", "")
+        if token == "latest":
+            return 200, {"value": [], "@odata.deltaLink": self._delta_link(call, self.drive.version)}, {}
+        round_id, _, offset = call.query.get("$skiptoken", "").partition(".")
+        if round_id not in self._delta_rounds:
+            if token and not token.isdigit():
+                return _error(410, "resyncRequired", "The delta token is no longer valid.")
+            since = int(token or 0)
+            changed = [item.id for item in self.drive.walk(folder_id) if item.version > since]
+            round_id = uuid.uuid4().hex
+            self._delta_rounds[round_id] = (changed, self.drive.version)
+        changed, version = self._delta_rounds[round_id]
+        start = int(offset or 0)
+        end = start + DELTA_PAGE_SIZE
+        page: dict[str, Any] = {"value": [self._item_resource(item_id) for item_id in changed[start:end]]}
+        if end < len(changed):
+            page["@odata.nextLink"] = f"{self.base_url}{call.path}?$skiptoken={round_id}.{end}"
+        else:
+            del self._delta_rounds[round_id]
+            page["@odata.deltaLink"] = self._delta_link(call, version)
+        return 200, page, {}
+
+    def _delta_link(self, call: _Call, version: int) -> str:
+        return f"{self.base_url}{call.path}?token={version}"
+
+    def _bundle_resource(self, bundle_id: str) -> dict[str, Any]:
+        bundle = self.drive.bundles[bundle_id]
+        return {
+            "id": bundle.id,
+            "name": bundle.name,
+            "bundle": {"album": {}, "childCount": len(bundle.item_ids)},
+        }
+
+    def _list_bundles(self, call: _Call) -> Response:
+        return self._page(call, list(self.drive.bundles), self._bundle_resource)
+
+    def _create_bundle(self, call: _Call) -> Response:
+        bundle = self.drive.add_bundle(call.body.get("name", "Album"))
+        return 201, self._bundle_resource(bundle.id), {}
+
+    def _list_bundle_children(self, call: _Call) -> Response:
+        bundle = self.drive.bundles.get(call.params["id"])
+        if bundle is None:
+            return _not_found("Album")
+        return self._page(call, bundle.item_ids, self._item_resource)
+
+    def _add_to_bundle(self, call: _Call) -> Response:
+        bundle = self.drive.bundles.get(call.params["id"])
+        item_id = call.body.get("id")
+        if bundle is None or item_id not in self.drive.items:
+            return _not_found("Album or item")
+        if item_id in bundle.members:
+            return _error(409, "nameAlreadyExists", "The item is already in the album.")
+        bundle.item_ids.append(item_id)
+        bundle.members.add(item_id)
+        return 204, None, {}
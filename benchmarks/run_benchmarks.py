@@ -0,0 +1,388 @@
+"""Benchmark the scan, upload, cleanup and album services against the mock Graph server.
+
+Run from the repository root, for example::
+
+    python -m benchmarks.run_benchmarks --items 100000 --latency 0.02 --throttle-rate 0.01
+
+Each scenario builds its synthetic trees in a scratch folder and runs in a fresh
+process, so the peak RSS it reports is its own. The mock server shares that
+process, which makes the growth over the RSS measured before the run the better
+figure for the client alone.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from benchmarks.mock_graph import (
+    FaultProfile,
+    MockDrive,
+    MockGraphServer,
+    MockItem,
+    StaticCredential,
+)
+from benchmarks.synthetic import (
+    DEFAULT_FILES_PER_FOLDER,
+    DEFAULT_LARGE_FILE_SIZE,
+    TreeShape,
+    seed_drive,
+    write_local_tree,
+)
+from onedrive_helper.drive_index import DriveIndex
+from onedrive_helper.graph_client import GraphClient
+from onedrive_helper.services.album_creator import AlbumCreatorService
+from onedrive_helper.services.disk_cleanup import DiskCleanupService
+from onedrive_helper.services.folder_upload import FolderUploadService
+from onedrive_helper.services.sync_scanner import SyncScannerService
+
+try:
+    import resource
+except ImportError:
+    # Windows has no resource module, so peak RSS is not reported there.
+    resource = None
+
+REMOTE_PHOTOS = "/Pictures"
+SCENARIOS = ("scan", "upload", "cleanup", "album")
+REMOTE_HASH_CHOICES = {
+    "sha1": ("sha1",),
+    "quickxor": ("quickxor",),
+    "both": ("sha1", "quickxor"),
+}
+
+
+@dataclass
+class BenchmarkOptions:  # pylint: disable=too-many-instance-attributes
+    """Tree size, fault injection and client settings shared by every scenario."""
+
+    items: int = 10_000
+    files_per_folder: int = DEFAULT_FILES_PER_FOLDER
+    large_file_ratio: float = 0.0
+    large_file_size: int = DEFAULT_LARGE_FILE_SIZE
+    remote_hashes: str = "sha1"
+    latency: float = 0.0
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    retry_after: int = 1
+    seed: Optional[int] = 0
+    hedge_reads: bool = False
+    drive_index: bool = False
+    workdir: Optional[str] = None
+
+    @property
+    def shape(self) -> TreeShape:
+        """The synthetic tree every scenario builds."""
+        return TreeShape(
+            self.items,
+            self.files_per_folder,
+            self.large_file_ratio,
+            self.large_file_size,
+        )
+
+    def seed_remote_tree(self, drive: MockDrive, *, every: int = 1) -> MockItem:
+        """Seed the synthetic tree below ``REMOTE_PHOTOS`` and return that folder."""
+        return seed_drive(
+            drive,
+            REMOTE_PHOTOS,
+            self.shape,
+            every=every,
+            hash_types=REMOTE_HASH_CHOICES[self.remote_hashes],
+        )
+
+
+@dataclass
+class BenchmarkResult:  # pylint: disable=too-many-instance-attributes
+    """Measurements of one scenario run."""
+
+    scenario: str
+    items: int
+    requests: int
+    operations: int
+    throttled: int
+    server_errors: int
+    wall_seconds: float
+    items_per_second: float
+    peak_rss_mb: Optional[float]
+    rss_growth_mb: Optional[float]
+    outcome: str
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _setup_scan(drive: MockDrive, workdir: Path, options: BenchmarkOptions) -> dict[str, Any]:
+    """Write the local tree and upload every other file of it to the drive."""
+    local = workdir / "local"
+    write_local_tree(local, options.shape)
+    options.seed_remote_tree(drive, every=2)
+    return {"local": local}
+
+
+def _setup_upload(_drive: MockDrive, workdir: Path, options: BenchmarkOptions) -> dict[str, Any]:
+    """Write the local tree; the drive starts empty."""
+    local = workdir / "local"
+    write_local_tree(local, options.shape)
+    return {"local": local}
+
+
+def _setup_album(drive: MockDrive, _workdir: Path, options: BenchmarkOptions) -> dict[str, Any]:
+    """Fill a drive folder with the tree's photos."""
+    folder = options.seed_remote_tree(drive)
+    return {"source_folder": {"id": folder.id, "name": folder.name, "path": REMOTE_PHOTOS}}
+
+
+async def _open_drive_index(
+    graph_client: GraphClient,
+    workdir: Path,
+    options: BenchmarkOptions,
+) -> Optional[DriveIndex]:
+    if not options.drive_index:
+        return None
+    drive_index = DriveIndex(str(workdir / "drive_index.sqlite3"))
+    await drive_index.sync(graph_client)
+    return drive_index
+
+
+async def _run_scan(
+    graph_client: GraphClient,
+    workdir: Path,
+    options: BenchmarkOptions,
+    context: dict[str, Any],
+) -> str:
+    drive_index = await _open_drive_index(graph_client, workdir, options)
+    try:
+        report = await SyncScannerService(graph_client, drive_index).run(str(context["local"]))
+    finally:
+        if drive_index is not None:
+            drive_index.close()
+    return f"synced={report.synced_files} unsynced={report.unsynced_files} errors={len(report.errors)}"
+
+
+async def _run_cleanup(
+    graph_client: GraphClient,
+    workdir: Path,
+    options: BenchmarkOptions,
+    context: dict[str, Any],
+) -> str:
+    drive_index = await _open_drive_index(graph_client, workdir, options)
+    try:
+        result = await DiskCleanupService(graph_client, drive_index).run(str(context["local"]))
+    finally:
+        if drive_index is not None:
+            drive_index.close()
+    return f"deleted={result.deleted_files} skipped={result.skipped_files} errors={len(result.errors)}"
+
+
+async def _run_upload(
+    graph_client: GraphClient,
+    _workdir: Path,
+    _options: BenchmarkOptions,
+    context: dict[str, Any],
+) -> str:
+    result = await FolderUploadService(graph_client).run(str(context["local"]), "/Benchmark/Upload")
+    return f"uploaded={result.uploaded_files} skipped={result.skipped_files} failed={result.failed_files}"
+
+
+async def _run_album(
+    graph_client: GraphClient,
+    _workdir: Path,
+    _options: BenchmarkOptions,
+    context: dict[str, Any],
+) -> str:
+    result = await AlbumCreatorService(graph_client).run(
+        context["source_folder"],
+        album_name="Benchmark Album",
+    )
+    return f"added={result.added_files} failed={result.failed_files}"
+
+
+_SETUP: dict[str, Callable[[MockDrive, Path, BenchmarkOptions], dict[str, Any]]] = {
+    "scan": _setup_scan,
+    "upload": _setup_upload,
+    "cleanup": _setup_scan,
+    "album": _setup_album,
+}
+_RUN: dict[str, Callable[[GraphClient, Path, BenchmarkOptions, dict[str, Any]], Awaitable[str]]] = {
+    "scan": _run_scan,
+    "upload": _run_upload,
+    "cleanup": _run_cleanup,
+    "album": _run_album,
+}
+
+
+async def run_scenario(scenario: str, options: BenchmarkOptions, workdir: Path) -> BenchmarkResult:
+    """Build the scenario's trees in ``workdir``, run its service and measure it."""
+    drive = MockDrive()
+    context = _SETUP[scenario](drive, workdir, options)
+    faults = FaultProfile(
+        latency=options.latency,
+        throttle_rate=options.throttle_rate,
+        error_rate=options.error_rate,
+        retry_after=options.retry_after,
+        seed=options.seed,
+    )
+    async with MockGraphServer(drive, faults) as server, GraphClient(
+        StaticCredential(),
+        hedge_reads=options.hedge_reads,
+        graph_base=server.base_url,
+    ) as graph_client:
+        rss_before = _peak_rss_mb()
+        started = time.perf_counter()
+        outcome = await _RUN[scenario](graph_client, workdir, options, context)
+        wall_seconds = time.perf_counter() - started
+        peak_rss = _peak_rss_mb()
+
+    return BenchmarkResult(
+        scenario=scenario,
+        items=options.items,
+        requests=server.total_requests,
+        operations=server.total_operations,
+        throttled=server.throttled,
+        server_errors=server.server_errors,
+        wall_seconds=round(wall_seconds, 3),
+        items_per_second=round(options.items / wall_seconds, 1) if wall_seconds else 0.0,
+        peak_rss_mb=round(peak_rss, 1) if peak_rss is not None else None,
+        rss_growth_mb=round(peak_rss - rss_before, 1) if peak_rss is not None else None,
+        outcome=outcome,
+    )
+
+
+def _run_in_process(scenario: str, options: BenchmarkOptions) -> BenchmarkResult:
+    """Run one scenario in a scratch folder, which also receives the album state files."""
+    logging.getLogger("onedrive_helper").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix=f"onedrive-bench-{scenario}-", dir=options.workdir) as workdir:
+        os.chdir(workdir)
+        return asyncio.run(run_scenario(scenario, options, Path(workdir)))
+
+
+def run_benchmarks(scenarios: list[str], options: BenchmarkOptions) -> list[BenchmarkResult]:
+    """Run each scenario in its own process and return the results in order."""
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for scenario in scenarios:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results.append(executor.submit(_run_in_process, scenario, options).result())
+    return results
+
+
+def print_results(results: list[BenchmarkResult]) -> None:
+    """Print a results table."""
+    header = (
+        f"{'Scenario':<9} {'Items':>9} {'Requests':>9} {'Ops':>9} {'429':>6} {'5xx':>6} "
+        f"{'Wall (s)':>9} {'Items/s':>9} {'Peak MB':>8} {'+MB':>7}  Outcome"
+    )
+    print(header)
+    print("─" * len(header))
+    for result in results:
+        peak = f"{result.peak_rss_mb:.1f}" if result.peak_rss_mb is not None else "n/a"
+        growth = f"{result.rss_growth_mb:.1f}" if result.rss_growth_mb is not None else "n/a"
+        print(
+            f"{result.scenario:<9} {result.items:>9} {result.requests:>9} {result.operations:>9} "
+            f"{result.throttled:>6} {result.server_errors:>6} {result.wall_seconds:>9.2f} "
+            f"{result.items_per_second:>9.1f} {peak:>8} {growth:>7}  {result.outcome}"
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the benchmark argument parser."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=SCENARIOS,
+        help="Scenario to run; repeat for several. All scenarios run by default.",
+    )
+    parser.add_argument("--items", type=int, default=10_000, help="Files in the synthetic tree")
+    parser.add_argument(
+        "--files-per-folder",
+        type=int,
+        default=DEFAULT_FILES_PER_FOLDER,
+        help="Files per synthetic folder",
+    )
+    parser.add_argument(
+        "--large-file-ratio",
+        type=float,
+        default=0.0,
+        help="Fraction of files made large enough to need an upload session",
+    )
+    parser.add_argument(
+        "--large-file-size",
+        type=float,
+        default=DEFAULT_LARGE_FILE_SIZE / (1024 * 1024),
+        help="Size of the large files in MiB",
+    )
+    parser.add_argument(
+        "--remote-hashes",
+        choices=sorted(REMOTE_HASH_CHOICES),
+        default="sha1",
+        help="Hashes seeded drive files report; 'quickxor' mimics OneDrive for Business",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with 429",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with a 5xx error",
+    )
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for fault injection")
+    parser.add_argument("--hedge-reads", action="store_true", help="Hedge slow GET requests")
+    parser.add_argument(
+        "--drive-index",
+        action="store_true",
+        help="Match scan and cleanup files against a delta-synced drive index",
+    )
+    parser.add_argument("--workdir", help="Folder for the scratch trees (default: system temp)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to a JSON file")
+    return parser
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    args = build_parser().parse_args()
+    options = BenchmarkOptions(
+        items=args.items,
+        files_per_folder=args.files_per_folder,
+        large_file_ratio=args.large_file_ratio,
+        large_file_size=int(args.large_file_size * 1024 * 1024),
+        remote_hashes=args.remote_hashes,
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        hedge_reads=args.hedge_reads,
+        drive_index=args.drive_index,
+        workdir=os.path.abspath(args.workdir) if args.workdir else None,
+    )
+    results = run_benchmarks(args.scenario or list(SCENARIOS), options)
+    print_results(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file_handle:
+            json.dump([asdict(result) for result in results], file_handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
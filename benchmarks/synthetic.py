@@ -0,0 +1,97 @@
+"""Deterministic synthetic photo trees, written to disk or seeded into a ``MockDrive``.
+
+File ``i`` has the same name, folder and bytes wherever it is generated, so a
+local tree and a drive seeded with the same ``TreeShape`` hold matching files.
+Small file sizes repeat every eight files, which leaves several same-sized
+candidates for the hash check as real photo libraries do. A share of the files
+can be made larger than ``SMALL_FILE_UPLOAD_BYTES`` so uploads go through
+upload sessions.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from benchmarks.mock_graph import MockDrive, MockItem, content_hashes
+from onedrive_helper.config import SMALL_FILE_UPLOAD_BYTES
+
+DEFAULT_FILES_PER_FOLDER = 1000
+DEFAULT_LARGE_FILE_SIZE = 2 * SMALL_FILE_UPLOAD_BYTES
+
+
+@dataclass
+class TreeShape:
+    """Number, layout and sizes of the files in a synthetic tree.
+
+    ``large_file_ratio`` of the files, spread evenly through the tree, hold
+    ``large_file_size`` bytes instead of about a hundred.
+    """
+
+    count: int
+    files_per_folder: int = DEFAULT_FILES_PER_FOLDER
+    large_file_ratio: float = 0.0
+    large_file_size: int = DEFAULT_LARGE_FILE_SIZE
+
+    def is_large(self, index: int) -> bool:
+        """Return whether synthetic file ``index`` is a large one."""
+        if self.large_file_ratio <= 0:
+            return False
+        return index % max(1, round(1 / self.large_file_ratio)) == 0
+
+    def iter_files(self) -> Iterator[tuple[str, int]]:
+        """Yield ``(folder name, file index)`` for every file of the tree."""
+        for index in range(self.count):
+            yield f"batch_{index // self.files_per_folder:05d}", index
+
+    def content(self, index: int) -> bytes:
+        """Return the bytes of synthetic file ``index``."""
+        pattern = f"{index:07d}".encode()
+        if not self.is_large(index):
+            return pattern * (8 + index % 8)
+        return (pattern * (self.large_file_size // len(pattern) + 1))[: self.large_file_size]
+
+
+def file_name(index: int) -> str:
+    """Return the name of synthetic file ``index``."""
+    return f"IMG_{index:07d}.jpg"
+
+
+def write_local_tree(root: Path, shape: TreeShape) -> None:
+    """Write every file of a synthetic tree below ``root``."""
+    for folder, index in shape.iter_files():
+        folder_path = root / folder
+        if index % shape.files_per_folder == 0:
+            folder_path.mkdir(parents=True, exist_ok=True)
+        (folder_path / file_name(index)).write_bytes(shape.content(index))
+
+
+def seed_drive(
+    drive: MockDrive,
+    remote_root: str,
+    shape: TreeShape,
+    *,
+    every: int = 1,
+    hash_types: tuple[str, ...] = ("sha1",),
+) -> MockItem:
+    """Add every ``every``-th file of a synthetic tree below ``remote_root`` and return that folder.
+
+    Seeded files carry only the hashes in ``hash_types``; ``("quickxor",)``
+    matches what OneDrive for Business reports.
+    """
+    root = drive.ensure_folder(remote_root)
+    folders: dict[str, MockItem] = {}
+    for folder, index in shape.iter_files():
+        if folder not in folders:
+            folders[folder] = drive.child(root.id, folder) or drive.add_folder(root.id, folder)
+        if index % every:
+            continue
+        content = shape.content(index)
+        drive.add_file(
+            folders[folder].id,
+            file_name(index),
+            size=len(content),
+            hashes=content_hashes(content, hash_types),
+        )
+    return root
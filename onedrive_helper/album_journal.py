@@ -0,0 +1,159 @@
+"""Persistent album population state: the resume journal and source folder delta links."""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Iterable, Optional
+
+from onedrive_helper.config import ALBUM_DELTA_FILE, ALBUM_JOURNAL_COMPACT_RECORDS
+
+
+@dataclass
+class AlbumState:
+    """Persisted resume metadata for album creation."""
+
+    album_id: Optional[str]
+    added_ids: set[str]
+    source_folder: Optional[dict[str, str]]
+
+
+def load_album_state(path: str) -> AlbumState:
+    """Read a resume journal, or a legacy single-document ``.album_state_*.json`` file.
+
+    A journal starts with a header line holding the album and source folder,
+    followed by one ``{"added": [...]}`` line per saved batch. A torn final line
+    from an interrupted write is ignored.
+    """
+    state = AlbumState(album_id=None, added_ids=set(), source_folder=None)
+    if not os.path.exists(path):
+        return state
+    with open(path, encoding="utf-8") as file_handle:
+        text = file_handle.read()
+
+    try:
+        records = [json.loads(text)]
+    except json.JSONDecodeError:
+        records = []
+        for line in text.splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        if "album_id" in record:
+            state.album_id = record["album_id"]
+        if isinstance(record.get("source_folder"), dict):
+            state.source_folder = record["source_folder"]
+        # Legacy files store the full list under "added_ids"; journal records use "added".
+        state.added_ids.update(record.get("added_ids", []))
+        state.added_ids.update(record.get("added", []))
+    return state
+
+
+class AlbumJournal:
+    """Append newly added item IDs to a resume journal, compacting it periodically.
+
+    Each save appends one line with only the IDs added since the previous save,
+    so the cost of a save does not grow with the album. After
+    ``ALBUM_JOURNAL_COMPACT_RECORDS`` appended lines the journal is rewritten as a
+    header plus a single record. The first save also compacts, which converts a
+    legacy state file at the same path to the journal format.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        album_id: str,
+        source_folder: dict[str, str],
+        added_ids: set[str],
+    ) -> None:
+        self.path = path
+        self._album_id = album_id
+        self._source_folder = source_folder
+        self._added_ids = added_ids
+        self._file: Optional[IO[str]] = None
+        self._records = 0
+
+    def __enter__(self) -> "AlbumJournal":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the journal file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, item_ids: Iterable[str]) -> None:
+        """Record item IDs that were just added to the album."""
+        item_ids = list(item_ids)
+        self._added_ids.update(item_ids)
+        if self._file is None:
+            self.compact()
+            return
+        if not item_ids:
+            return
+        self._file.write(json.dumps({"added": item_ids}) + "\n")
+        self._file.flush()
+        self._records += 1
+        if self._records >= ALBUM_JOURNAL_COMPACT_RECORDS:
+            self.compact()
+
+    def compact(self) -> None:
+        """Atomically rewrite the journal as a header and one record of every added ID."""
+        self.close()
+        header = {
+            "album_id": self._album_id,
+            "source_folder": self._source_folder,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file_handle:
+            file_handle.write(json.dumps(header) + "\n")
+            file_handle.write(json.dumps({"added": sorted(self._added_ids)}) + "\n")
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+        self._records = 0
+
+
+def _delta_key(album_id: str, folder_id: str) -> str:
+    return f"{album_id}:{folder_id}"
+
+
+def _read_delta_links(path: str) -> dict[str, str]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as file_handle:
+            data = json.load(file_handle)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_delta_link(album_id: str, folder_id: str, path: str = ALBUM_DELTA_FILE) -> Optional[str]:
+    """Return the stored delta link for an album's source folder, if any."""
+    return _read_delta_links(path).get(_delta_key(album_id, folder_id))
+
+
+def save_delta_link(
+    album_id: str,
+    folder_id: str,
+    delta_link: str,
+    path: str = ALBUM_DELTA_FILE,
+) -> None:
+    """Store the delta link for an album's source folder, keeping other entries."""
+    links = _read_delta_links(path)
+    links[_delta_key(album_id, folder_id)] = delta_link
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file_handle:
+        json.dump(links, file_handle, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
@@ -0,0 +1,98 @@
+"""Back up local files with the cheapest mechanism the filesystem supports."""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no fcntl, so reflinks are never attempted there.
+    fcntl = None
+
+# ioctl request that asks Linux filesystems such as Btrfs and XFS for a copy-on-write clone.
+FICLONE = 0x40049409
+BACKUP_STRATEGIES = ("reflink", "hardlink", "copy_file_range", "copy")
+COPY_RANGE_CHUNK = 64 * 1024 * 1024
+
+
+def _reflink(source: Path, destination: Path) -> None:
+    if fcntl is None:
+        raise OSError("Reflinks are not supported on this platform.")
+    with open(source, "rb") as source_handle, open(destination, "wb") as destination_handle:
+        fcntl.ioctl(destination_handle.fileno(), FICLONE, source_handle.fileno())
+    shutil.copystat(source, destination)
+
+
+def _hardlink(source: Path, destination: Path) -> None:
+    if os.stat(source).st_dev != os.stat(destination.parent).st_dev:
+        raise OSError("Backup folder is on a different device.")
+    temp_path = destination.with_name(destination.name + ".tmp-link")
+    if temp_path.exists():
+        temp_path.unlink()
+    os.link(source, temp_path)
+    os.replace(temp_path, destination)
+
+
+def _copy_file_range(source: Path, destination: Path) -> None:
+    copy_range = getattr(os, "copy_file_range", None)
+    send_file = getattr(os, "sendfile", None)
+    if copy_range is None and send_file is None:
+        raise OSError("In-kernel copies are not supported on this platform.")
+    with open(source, "rb") as source_handle, open(destination, "wb") as destination_handle:
+        source_fd = source_handle.fileno()
+        destination_fd = destination_handle.fileno()
+        remaining = os.fstat(source_fd).st_size
+        while remaining > 0:
+            if copy_range is not None:
+                copied = copy_range(source_fd, destination_fd, min(remaining, COPY_RANGE_CHUNK))
+            else:
+                copied = send_file(destination_fd, source_fd, None, min(remaining, COPY_RANGE_CHUNK))
+            if copied == 0:
+                # Some FUSE and network filesystems report no progress instead of failing.
+                raise OSError("In-kernel copy stopped before the end of the file.")
+            remaining -= copied
+    shutil.copystat(source, destination)
+
+
+def _copy(source: Path, destination: Path) -> None:
+    shutil.copy2(source, destination)
+
+
+def _check_size(source: Path, destination: Path) -> None:
+    if os.stat(destination).st_size != os.stat(source).st_size:
+        raise OSError(f"Backup of '{source}' is incomplete.")
+
+
+_STRATEGY_FUNCTIONS = {
+    "reflink": _reflink,
+    "hardlink": _hardlink,
+    "copy_file_range": _copy_file_range,
+    "copy": _copy,
+}
+
+
+def backup_file(source: Path, destination: Path, strategy: str = "auto") -> str:
+    """Copy ``source`` to ``destination`` and return the name of the strategy that worked.
+
+    Strategies are tried from the cheapest: a copy-on-write reflink, a hardlink
+    when both paths are on the same device, an in-kernel ``copy_file_range`` or
+    ``sendfile`` copy, and finally a plain ``shutil.copy2``. ``strategy`` names
+    the first one to try, or ``"auto"`` to try them all. A backup whose size
+    differs from the source counts as failed, and ``OSError`` is raised when even
+    the plain copy is incomplete.
+    """
+    start = 0 if strategy == "auto" else BACKUP_STRATEGIES.index(strategy)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    for name in BACKUP_STRATEGIES[start:-1]:
+        try:
+            _STRATEGY_FUNCTIONS[name](source, destination)
+            _check_size(source, destination)
+            return name
+        except OSError:
+            continue
+    _copy(source, destination)
+    _check_size(source, destination)
+    return "copy"
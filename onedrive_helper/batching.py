@@ -0,0 +1,139 @@
+"""Coalesce independent Graph GET requests into ``$batch`` submissions."""
+
+# pylint: disable=too-few-public-methods
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any
+
+from onedrive_helper.config import (
+    BATCH_LIMIT,
+    BATCH_MAX_IN_FLIGHT,
+    RETRY_CAP,
+    RETRY_MAX,
+    RETRYABLE_STATUSES,
+    THROTTLE_STATUSES,
+    setup_logging,
+)
+from onedrive_helper.errors import GraphRequestError, extract_error_message
+
+log = setup_logging()
+
+
+@dataclass
+class _PendingRequest:
+    url: str
+    future: asyncio.Future
+    attempt: int = 1
+
+
+class BatchedGetQueue:
+    """Collect relative GET requests from concurrent callers and send them in ``$batch`` calls.
+
+    Requests submitted during the same event-loop tick are grouped, and while
+    ``max_in_flight`` batches are outstanding new requests keep accumulating, so
+    batches fill up under load without delaying a lone request.
+    """
+
+    def __init__(self, graph_client, max_in_flight: int = BATCH_MAX_IN_FLIGHT) -> None:
+        self._graph_client = graph_client
+        self._max_in_flight = max_in_flight
+        self._pending: list[_PendingRequest] = []
+        self._in_flight = 0
+        self._flush_scheduled = False
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def get(self, relative_url: str) -> dict[str, Any]:
+        """Queue a GET for a Graph URL relative to the API version root and await its body."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_PendingRequest(relative_url, future))
+        self._schedule_flush()
+        return await future
+
+    def _schedule_flush(self) -> None:
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        while self._pending and self._in_flight < self._max_in_flight:
+            chunk = [entry for entry in self._pending[:BATCH_LIMIT] if not entry.future.done()]
+            del self._pending[:BATCH_LIMIT]
+            if not chunk:
+                continue
+            self._in_flight += 1
+            task = asyncio.create_task(self._submit(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _fail(chunk: list[_PendingRequest], exc: BaseException) -> None:
+        """Resolve every unfinished caller in a chunk with the error that ended its batch."""
+        for entry in chunk:
+            if entry.future.done():
+                continue
+            if isinstance(exc, asyncio.CancelledError):
+                entry.future.cancel()
+            else:
+                entry.future.set_exception(exc)
+
+    async def _submit(self, chunk: list[_PendingRequest]) -> None:
+        try:
+            retries, retry_after = await self._send(chunk)
+            if retries:
+                log.warning(
+                    "Batch sub-requests throttled or failed (%d). Retrying in %ds.",
+                    len(retries),
+                    retry_after,
+                )
+                await asyncio.sleep(retry_after)
+                self._pending[:0] = retries
+        except BaseException as exc:  # pylint: disable=broad-exception-caught
+            # Callers would otherwise wait forever on futures no task resolves.
+            self._fail(chunk, exc)
+            if not isinstance(exc, Exception):
+                # Cancellation and interpreter exits still end this task.
+                raise
+        finally:
+            self._in_flight -= 1
+            if self._pending:
+                self._schedule_flush()
+
+    async def _send(self, chunk: list[_PendingRequest]) -> tuple[list[_PendingRequest], int]:
+        requests = [
+            {"id": str(index), "method": "GET", "url": entry.url}
+            for index, entry in enumerate(chunk)
+        ]
+        response = await self._graph_client.post_batch(requests)
+        responses = {item.get("id"): item for item in response.get("responses", [])}
+        retries: list[_PendingRequest] = []
+        retry_after = 0
+        for index, entry in enumerate(chunk):
+            if entry.future.done():
+                continue
+            sub_response = responses.get(str(index), {})
+            status = sub_response.get("status", 0)
+            body = sub_response.get("body", {})
+            if not sub_response or status in RETRYABLE_STATUSES:
+                if entry.attempt >= RETRY_MAX:
+                    entry.future.set_exception(
+                        RuntimeError(f"All retries exhausted for GET {entry.url}")
+                    )
+                    continue
+                delay = min(2 ** (entry.attempt - 1), RETRY_CAP)
+                delay = int(sub_response.get("headers", {}).get("Retry-After", delay))
+                retry_after = max(retry_after, delay)
+                if status in THROTTLE_STATUSES:
+                    # Throttled sub-requests count against the whole client, like direct calls.
+                    self._graph_client.throttle.on_throttle(delay)
+                entry.attempt += 1
+                retries.append(entry)
+            elif status >= 400:
+                message = extract_error_message(body)
+                entry.future.set_exception(GraphRequestError(status, "GET", entry.url, message))
+            else:
+                entry.future.set_result(body if isinstance(body, dict) else {})
+        return retries, retry_after
@@ -4,23 +4,78 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Optional
 
 from onedrive_helper.auth import get_credential
-from onedrive_helper.config import setup_logging
+from onedrive_helper.backup import BACKUP_STRATEGIES
+from onedrive_helper.config import (
+    DRIVE_INDEX_FILE,
+    HASH_CACHE_FILE,
+    HASH_WORKERS,
+    SCAN_SNAPSHOT_FILE,
+    setup_logging,
+)
+from onedrive_helper.drive_index import DriveIndex
 from onedrive_helper.graph_client import GraphClient
+from onedrive_helper.hash_cache import HashCache
+from onedrive_helper.hashing import HashEngine
 from onedrive_helper.output import export_json, print_result
+from onedrive_helper.scan_snapshot import ScanSnapshot
 from onedrive_helper.services.album_creator import AlbumCreatorService
 from onedrive_helper.services.disk_cleanup import DiskCleanupService
 from onedrive_helper.services.folder_upload import FolderUploadService
 from onedrive_helper.services.sync_scanner import SyncScannerService
 
-setup_logging()
+log = setup_logging()
+
+
+def _open_hash_cache(args: argparse.Namespace, stack: ExitStack) -> Optional[HashCache]:
+    if not args.hash_cache:
+        return None
+    return stack.enter_context(HashCache(args.hash_cache))
+
+
+def _create_hash_engine(args: argparse.Namespace, hash_cache: Optional[HashCache]) -> HashEngine:
+    return HashEngine(hash_cache, workers=args.hash_workers, use_processes=args.hash_processes)
+
+
+def _prune_hash_cache(hash_cache: Optional[HashCache], local_path: str) -> None:
+    if hash_cache is None:
+        return
+    evicted = hash_cache.evict_stale(str(Path(local_path).expanduser().resolve()))
+    if evicted:
+        log.info("Evicted %d stale hash cache entries.", evicted)
+
+
+async def _open_drive_index(
+    graph_client: GraphClient,
+    args: argparse.Namespace,
+    stack: ExitStack,
+) -> Optional[DriveIndex]:
+    if not args.drive_index:
+        return None
+    drive_index = stack.enter_context(DriveIndex(args.drive_index))
+    changed = await drive_index.sync(graph_client)
+    log.info("Drive index '%s' refreshed with %d changed items.", args.drive_index, changed)
+    return drive_index
 
 
 async def _run_cleanup(args: argparse.Namespace) -> object:
-    async with GraphClient(get_credential()) as graph_client:
-        service = DiskCleanupService(graph_client)
-        return await service.run(args.local_path, args.backup_path)
+    with ExitStack() as stack:
+        hash_cache = _open_hash_cache(args, stack)
+        async with GraphClient(
+            get_credential(),
+            hash_cache=hash_cache,
+            hash_engine=_create_hash_engine(args, hash_cache),
+            hedge_reads=args.hedge_reads,
+        ) as graph_client:
+            drive_index = await _open_drive_index(graph_client, args, stack)
+            service = DiskCleanupService(graph_client, drive_index, args.backup_strategy)
+            result = await service.run(args.local_path, args.backup_path)
+        _prune_hash_cache(hash_cache, args.local_path)
+        return result
 
 
 async def _resolve_album_source(graph_client: GraphClient, args: argparse.Namespace) -> dict[str, str]:
@@ -54,7 +109,7 @@ async def _resolve_album_target(graph_client: GraphClient, args: argparse.Namesp
 
 
 async def _run_album(args: argparse.Namespace) -> object:
-    async with GraphClient(get_credential()) as graph_client:
+    async with GraphClient(get_credential(), hedge_reads=args.hedge_reads) as graph_client:
         source_folder = await _resolve_album_source(graph_client, args) if not args.resume else None
         album_id, album_name = await _resolve_album_target(graph_client, args)
         service = AlbumCreatorService(graph_client)
@@ -68,19 +123,42 @@ async def _run_album(args: argparse.Namespace) -> object:
             album_id=album_id,
             dry_run=args.dry_run,
             resume_path=args.resume,
+            full_scan=args.full_scan,
         )
 
 
 async def _run_upload(args: argparse.Namespace) -> object:
-    async with GraphClient(get_credential()) as graph_client:
-        service = FolderUploadService(graph_client)
-        return await service.run(args.local_path, args.remote_path)
+    with ExitStack() as stack:
+        hash_cache = _open_hash_cache(args, stack)
+        async with GraphClient(
+            get_credential(),
+            hash_cache=hash_cache,
+            hash_engine=_create_hash_engine(args, hash_cache),
+            direct_child_lookup=args.direct_lookup,
+            hedge_reads=args.hedge_reads,
+            use_mmap=args.mmap,
+        ) as graph_client:
+            service = FolderUploadService(graph_client)
+            result = await service.run(args.local_path, args.remote_path)
+        _prune_hash_cache(hash_cache, args.local_path)
+        return result
 
 
 async def _run_scan(args: argparse.Namespace) -> object:
-    async with GraphClient(get_credential()) as graph_client:
-        service = SyncScannerService(graph_client)
-        return await service.run(args.local_path, include_all=args.all_files)
+    with ExitStack() as stack:
+        hash_cache = _open_hash_cache(args, stack)
+        async with GraphClient(
+            get_credential(),
+            hash_cache=hash_cache,
+            hash_engine=_create_hash_engine(args, hash_cache),
+            hedge_reads=args.hedge_reads,
+        ) as graph_client:
+            drive_index = await _open_drive_index(graph_client, args, stack)
+            snapshot = stack.enter_context(ScanSnapshot(args.snapshot)) if args.snapshot else None
+            service = SyncScannerService(graph_client, drive_index, snapshot)
+            result = await service.run(args.local_path, include_all=args.all_files)
+        _prune_hash_cache(hash_cache, args.local_path)
+        return result
 
 
 async def _dispatch(args: argparse.Namespace) -> object:
@@ -95,6 +173,46 @@ async def _dispatch(args: argparse.Namespace) -> object:
     raise ValueError(f"Unsupported command: {args.command}")
 
 
+def _add_hash_cache_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--hash-cache",
+        nargs="?",
+        const=HASH_CACHE_FILE,
+        help="Reuse local file hashes from a persistent cache between runs",
+    )
+
+
+def _add_hashing_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--hash-workers",
+        type=int,
+        default=HASH_WORKERS,
+        help="Number of files hashed in parallel; use fewer on spinning disks",
+    )
+    parser.add_argument(
+        "--hash-processes",
+        action="store_true",
+        help="Hash in worker processes instead of threads to use every core",
+    )
+
+
+def _add_drive_index_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--drive-index",
+        nargs="?",
+        const=DRIVE_INDEX_FILE,
+        help="Match against a local drive index refreshed via delta instead of per-file searches",
+    )
+
+
+def _add_hedge_reads_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--hedge-reads",
+        action="store_true",
+        help="Send a duplicate of unusually slow read requests and use the first answer",
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     """Build the CLI parser."""
     parser = argparse.ArgumentParser(description="Unified OneDrive helper CLI")
@@ -103,6 +221,16 @@ def build_parser() -> argparse.ArgumentParser:
     cleanup_parser = subparsers.add_parser("cleanup", help="Delete local files already synced to OneDrive")
     cleanup_parser.add_argument("--local-path", required=True, help="Local folder to scan")
     cleanup_parser.add_argument("--backup-path", help="Optional backup destination before deletion")
+    cleanup_parser.add_argument(
+        "--backup-strategy",
+        choices=("auto", *BACKUP_STRATEGIES),
+        default="auto",
+        help="Cheapest backup mechanism to try first; slower ones are used as fallbacks",
+    )
+    _add_drive_index_argument(cleanup_parser)
+    _add_hash_cache_argument(cleanup_parser)
+    _add_hashing_arguments(cleanup_parser)
+    _add_hedge_reads_argument(cleanup_parser)
     cleanup_parser.add_argument("--output-json", help="Write the result to a JSON file")
 
     album_parser = subparsers.add_parser("album", help="Create or update a OneDrive album")
@@ -112,18 +240,47 @@ def build_parser() -> argparse.ArgumentParser:
     album_parser.add_argument("--album-name", help="Album name for new albums")
     album_parser.add_argument("--album-id", help="Existing album ID to reuse")
     album_parser.add_argument("--dry-run", action="store_true", help="Scan only without writing changes")
-    album_parser.add_argument("--resume", help="Resume from an album state JSON file")
+    album_parser.add_argument("--resume", help="Resume from an album state journal")
+    album_parser.add_argument(
+        "--full-scan",
+        action="store_true",
+        help="Enumerate the whole source folder even if a delta link from an earlier run is stored",
+    )
     album_parser.add_argument("--yes", action="store_true", help="Skip confirmation prompts")
+    _add_hedge_reads_argument(album_parser)
     album_parser.add_argument("--output-json", help="Write the result to a JSON file")
 
     upload_parser = subparsers.add_parser("upload", help="Upload a local folder to OneDrive")
     upload_parser.add_argument("--local-path", required=True, help="Local folder to upload")
     upload_parser.add_argument("--remote-path", required=True, help="OneDrive destination path")
+    upload_parser.add_argument(
+        "--direct-lookup",
+        action="store_true",
+        help="Check existing files by path instead of listing each destination folder",
+    )
+    upload_parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Memory-map files while uploading them; only for files nothing modifies meanwhile",
+    )
+    _add_hash_cache_argument(upload_parser)
+    _add_hashing_arguments(upload_parser)
+    _add_hedge_reads_argument(upload_parser)
     upload_parser.add_argument("--output-json", help="Write the result to a JSON file")
 
     scan_parser = subparsers.add_parser("scan", help="Scan a local folder and report sync status")
     scan_parser.add_argument("--local-path", required=True, help="Local folder to scan")
     scan_parser.add_argument("--all-files", action="store_true", help="Scan all files instead of media only")
+    _add_drive_index_argument(scan_parser)
+    scan_parser.add_argument(
+        "--snapshot",
+        nargs="?",
+        const=SCAN_SNAPSHOT_FILE,
+        help="Reuse earlier verdicts for unchanged synced files and recheck only the rest",
+    )
+    _add_hash_cache_argument(scan_parser)
+    _add_hashing_arguments(scan_parser)
+    _add_hedge_reads_argument(scan_parser)
     scan_parser.add_argument("--output-json", help="Write the result to a JSON file")
     return parser
 
@@ -3,16 +3,59 @@
 from __future__ import annotations
 
 import logging
+import os
 import sys
 
 GRAPH_BASE = "https://graph.microsoft.com/v1.0"
 BATCH_LIMIT = 20
+BATCH_MAX_IN_FLIGHT = 2
 PAGE_SIZE = 200
 RETRY_MAX = 6
 RETRY_CAP = 120
+# Graph answers these when it is throttling; they carry a Retry-After header.
+THROTTLE_STATUSES = (429, 503)
+SERVER_ERROR_STATUSES = (500, 502, 504)
+RETRYABLE_STATUSES = THROTTLE_STATUSES + SERVER_ERROR_STATUSES
 FOLDER_CONCURRENCY = 8
+SCAN_CONCURRENCY = BATCH_MAX_IN_FLIGHT * BATCH_LIMIT
+SCAN_QUEUE_SIZE = 4 * SCAN_CONCURRENCY
+WALK_BATCH_SIZE = 256
+CLEANUP_IO_WORKERS = 4
+UPLOAD_QUEUE_SIZE = 4 * FOLDER_CONCURRENCY
+MEDIA_QUEUE_SIZE = 10 * BATCH_LIMIT
+ALBUM_BATCH_IN_FLIGHT = 4
+ALBUM_JOURNAL_COMPACT_RECORDS = 500
+# Bounds for the adaptive limit on concurrent Graph requests across the whole client.
+CONCURRENCY_MIN = 1
+CONCURRENCY_MAX = 32
+CONCURRENCY_DECREASE_FACTOR = 0.5
+# Seconds a single response may stall between reads before the attempt is retried.
+REQUEST_TIMEOUT_SECONDS = 60
+# Hedged GETs: a duplicate is sent once a read takes longer than the recent p95 latency.
+HEDGE_INITIAL_DELAY = 1.0
+HEDGE_MIN_DELAY = 0.05
+HEDGE_LATENCY_WINDOW = 200
+HEDGE_BUDGET_RATIO = 0.1
+# Consecutive failed attempts that open the circuit, and how long it stays open.
+CIRCUIT_FAILURE_THRESHOLD = 8
+CIRCUIT_RESET_SECONDS = 30
 SMALL_FILE_UPLOAD_BYTES = 4 * 1024 * 1024
-UPLOAD_CHUNK_SIZE = 10 * 320 * 1024
+UPLOAD_CHUNK_UNIT = 320 * 1024
+UPLOAD_CHUNK_SIZE = 10 * UPLOAD_CHUNK_UNIT
+UPLOAD_CHUNK_MIN = UPLOAD_CHUNK_UNIT
+# Graph rejects upload-session fragments of 60 MiB or more, so this stays one unit below.
+UPLOAD_CHUNK_MAX = 191 * UPLOAD_CHUNK_UNIT
+UPLOAD_CHUNK_TARGET_SECONDS = 4.0
+# Memory-mapped uploads avoid a copy per chunk, but a file truncated mid-upload crashes the process.
+UPLOAD_USE_MMAP = False
+HASH_READ_SIZE = 8 * 320 * 1024
+# Hashing workers default to one per core; lower it for spinning disks that seek on parallel reads.
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+# Local hash types in the order they are preferred when Graph reports several.
+HASH_PREFERENCE = ("sha1", "sha256", "quickxor")
+# Hashes computed from the uploaded bytes and checked against the completed item.
+# Every drive type reports QuickXorHash; each extra digest costs CPU for every uploaded byte.
+UPLOAD_VERIFY_HASHES = ("quickxor",)
 MEDIA_MIME_PREFIXES = ("image/", "video/")
 MEDIA_EXTENSION_ALLOWLIST = (".mts",)
 VALID_MEDIA_SUFFIXES = (
@@ -36,6 +79,10 @@ SCOPES = ["User.Read", "Files.ReadWrite", "Files.Read.All"]
 AUTH_RECORD_FILE = ".graph_auth_record.json"
 TOKEN_CACHE_NAME = "onedrive_helper"
 DEFAULT_LOG_FILE = "onedrive_helper.log"
+DRIVE_INDEX_FILE = ".drive_index.sqlite3"
+HASH_CACHE_FILE = ".hash_cache.sqlite3"
+SCAN_SNAPSHOT_FILE = ".scan_snapshot.sqlite3"
+ALBUM_DELTA_FILE = ".album_delta.json"
 
 _LOGGING_STATE = {"configured": False}
 
@@ -0,0 +1,188 @@
+"""Persistent on-disk index of the remote drive, refreshed through the Graph delta API."""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Optional
+
+from onedrive_helper.config import DRIVE_INDEX_FILE, setup_logging
+from onedrive_helper.errors import GraphRequestError
+
+log = setup_logging()
+
+DELTA_SELECT = "id,name,size,file,folder,root,deleted,parentReference"
+_DELTA_URL_KEY = "delta_url"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    parent_id TEXT,
+    is_folder INTEGER NOT NULL DEFAULT 0,
+    is_root INTEGER NOT NULL DEFAULT 0,
+    sha1 TEXT,
+    sha256 TEXT,
+    quickxor TEXT
+);
+CREATE INDEX IF NOT EXISTS items_name_key ON items (name_key);
+CREATE INDEX IF NOT EXISTS items_size ON items (size);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class DriveIndex:
+    """SQLite mirror of drive item metadata used for offline file matching."""
+
+    def __init__(self, path: str = DRIVE_INDEX_FILE) -> None:
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._folder_paths: dict[str, str] = {}
+
+    def __enter__(self) -> "DriveIndex":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Commit pending changes and close the database."""
+        self._connection.commit()
+        self._connection.close()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, value),
+        )
+
+    def reset(self) -> None:
+        """Drop all indexed items and the stored delta position."""
+        self._connection.execute("DELETE FROM items")
+        self._connection.execute("DELETE FROM meta WHERE key = ?", (_DELTA_URL_KEY,))
+        self._connection.commit()
+        self._folder_paths.clear()
+
+    async def sync(self, graph_client) -> int:
+        """Apply drive changes since the stored delta position and return the change count."""
+        url = self._get_meta(_DELTA_URL_KEY)
+        if not url:
+            log.info("Building drive index from a full delta enumeration.")
+            url = f"{graph_client.graph_base}/me/drive/root/delta?$select={DELTA_SELECT}"
+
+        changed = 0
+        while url:
+            try:
+                page = await graph_client.get_url(url)
+            except GraphRequestError as exc:
+                if exc.status != 410:
+                    raise
+                log.warning("Delta token expired; rebuilding the drive index from scratch.")
+                self.reset()
+                url = f"{graph_client.graph_base}/me/drive/root/delta?$select={DELTA_SELECT}"
+                changed = 0
+                continue
+
+            values = page.get("value", [])
+            self._apply_changes(values)
+            changed += len(values)
+            # Persist the position after every page so an interrupted sync resumes here.
+            url = page.get("@odata.nextLink", "")
+            self._set_meta(_DELTA_URL_KEY, url or page.get("@odata.deltaLink", ""))
+            self._connection.commit()
+
+        self._folder_paths.clear()
+        return changed
+
+    def _apply_changes(self, items: list[dict[str, Any]]) -> None:
+        for item in items:
+            if "deleted" in item:
+                self._connection.execute("DELETE FROM items WHERE id = ?", (item["id"],))
+                continue
+
+            name = item.get("name", "")
+            hashes = item.get("file", {}).get("hashes", {})
+            self._connection.execute(
+                "INSERT OR REPLACE INTO items "
+                "(id, name, name_key, size, parent_id, is_folder, is_root, sha1, sha256, quickxor) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    item["id"],
+                    name,
+                    name.casefold(),
+                    item.get("size", 0) or 0,
+                    item.get("parentReference", {}).get("id"),
+                    int("folder" in item),
+                    int("root" in item),
+                    hashes.get("sha1Hash"),
+                    hashes.get("sha256Hash"),
+                    hashes.get("quickXorHash"),
+                ),
+            )
+
+    def _folder_path(self, folder_id: Optional[str]) -> str:
+        """Resolve a folder ID to a root-relative path using the indexed parent chain."""
+        if folder_id is None:
+            return "/"
+        if folder_id in self._folder_paths:
+            return self._folder_paths[folder_id]
+
+        row = self._connection.execute(
+            "SELECT name, parent_id, is_root FROM items WHERE id = ?",
+            (folder_id,),
+        ).fetchone()
+        if row is None or row[2]:
+            path = "/"
+        else:
+            parent_path = self._folder_path(row[1])
+            path = f"{parent_path.rstrip('/')}/{row[0]}"
+        self._folder_paths[folder_id] = path
+        return path
+
+    def has_file_size(self, size: int) -> bool:
+        """Return whether any indexed file has exactly this size."""
+        row = self._connection.execute(
+            "SELECT 1 FROM items WHERE size = ? AND is_folder = 0 LIMIT 1",
+            (size,),
+        ).fetchone()
+        return row is not None
+
+    def lookup(self, file_name: str) -> list[dict[str, Any]]:
+        """Return indexed files with the given name, shaped like Graph drive items."""
+        rows = self._connection.execute(
+            "SELECT id, name, size, parent_id, sha1, sha256, quickxor "
+            "FROM items WHERE name_key = ? AND is_folder = 0",
+            (file_name.casefold(),),
+        ).fetchall()
+
+        items: list[dict[str, Any]] = []
+        for item_id, name, size, parent_id, sha1, sha256, quickxor in rows:
+            hashes = {
+                key: value
+                for key, value in (
+                    ("sha1Hash", sha1),
+                    ("sha256Hash", sha256),
+                    ("quickXorHash", quickxor),
+                )
+                if value
+            }
+            parent_path = self._folder_path(parent_id)
+            items.append(
+                {
+                    "id": item_id,
+                    "name": name,
+                    "size": size,
+                    "file": {"hashes": hashes},
+                    "parentReference": {"id": parent_id},
+                    "cloud_path": f"{parent_path.rstrip('/')}/{name}",
+                }
+            )
+        return items
@@ -0,0 +1,43 @@
+"""Exception types shared across the OneDrive helper package."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class GraphRequestError(RuntimeError):
+    """Graph request failure with status context."""
+
+    def __init__(self, status: int, method: str, url: str, message: str) -> None:
+        super().__init__(f"HTTP {status} [{method}] {url}: {message}")
+        self.status = status
+        self.method = method
+        self.url = url
+        self.message = message
+
+
+class CircuitOpenError(RuntimeError):
+    """Request refused without being sent because recent requests kept failing."""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"Graph requests are failing; circuit open for another {retry_in:.0f}s.")
+        self.retry_in = retry_in
+
+
+class UploadVerificationError(RuntimeError):
+    """Uploaded content whose server-side hash differs from the bytes that were sent."""
+
+    def __init__(self, local_path: str, hash_type: str, local_digest: str, remote_digest: str) -> None:
+        super().__init__(
+            f"Upload verification failed for {local_path}: "
+            f"local {hash_type} {local_digest} != remote {remote_digest}"
+        )
+        self.local_path = local_path
+        self.hash_type = hash_type
+
+
+def extract_error_message(body: Any) -> str:
+    """Return the human-readable message from a Graph error body."""
+    if isinstance(body, dict):
+        return body.get("error", {}).get("message", "Graph request failed.")
+    return str(body)
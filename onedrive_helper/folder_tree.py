@@ -0,0 +1,125 @@
+"""Breadth-first creation of remote folder trees through Graph ``$batch``."""
+
+# pylint: disable=too-few-public-methods
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Iterable
+
+from onedrive_helper.config import BATCH_LIMIT, FOLDER_CONCURRENCY
+
+
+def _split_relative_path(relative_path: str) -> list[str]:
+    return [part for part in relative_path.replace("\\", "/").split("/") if part and part != "."]
+
+
+def _parent_and_name(relative_path: str) -> tuple[str, str]:
+    parent, _, name = relative_path.rpartition("/")
+    return parent, name
+
+
+class FolderTreeBuilder:
+    """Mirror a set of relative folder paths below a remote root folder.
+
+    Existing folders are discovered by listing each existing parent once through the
+    client's children cache, so later lookups in those folders need no request.
+    Missing folders are then created one depth level at a time, with every level
+    sent as concurrent ``$batch`` requests of up to ``BATCH_LIMIT`` creations.
+    """
+
+    def __init__(self, graph_client) -> None:
+        self._graph_client = graph_client
+        self._semaphore = asyncio.Semaphore(FOLDER_CONCURRENCY)
+
+    @staticmethod
+    def _group_by_depth(relative_paths: Iterable[str]) -> dict[int, set[str]]:
+        levels: dict[int, set[str]] = {}
+        for relative_path in relative_paths:
+            parts = _split_relative_path(relative_path)
+            for depth in range(1, len(parts) + 1):
+                levels.setdefault(depth, set()).add("/".join(parts[:depth]))
+        return levels
+
+    async def materialize(self, root_id: str, relative_paths: Iterable[str]) -> dict[str, str]:
+        """Ensure every relative folder path exists and return a relative-path to item-ID map.
+
+        Keys use ``/`` separators and the root folder is mapped from ``""``.
+        """
+        folder_ids = {"": root_id}
+        created: set[str] = set()
+        levels = self._group_by_depth(relative_paths)
+
+        for depth in sorted(levels):
+            paths = sorted(levels[depth])
+            listed_parents = {_parent_and_name(path)[0] for path in paths} - created
+            existing = await self._list_existing(listed_parents, folder_ids)
+
+            missing: list[str] = []
+            for path in paths:
+                parent, name = _parent_and_name(path)
+                item = existing.get(parent, {}).get(name.casefold())
+                if item is not None and "folder" in item:
+                    folder_ids[path] = item["id"]
+                else:
+                    missing.append(path)
+
+            await asyncio.gather(
+                *(
+                    self._create_chunk(missing[start : start + BATCH_LIMIT], folder_ids)
+                    for start in range(0, len(missing), BATCH_LIMIT)
+                )
+            )
+            created.update(missing)
+        return folder_ids
+
+    async def _list_existing(
+        self,
+        parent_paths: set[str],
+        folder_ids: dict[str, str],
+    ) -> dict[str, dict[str, dict[str, Any]]]:
+        async def list_parent(parent_path: str) -> tuple[str, dict[str, dict[str, Any]]]:
+            async with self._semaphore:
+                children = await self._graph_client.get_children_by_name(folder_ids[parent_path])
+            return parent_path, children
+
+        results = await asyncio.gather(*(list_parent(path) for path in sorted(parent_paths)))
+        return dict(results)
+
+    async def _create_chunk(self, chunk: list[str], folder_ids: dict[str, str]) -> None:
+        requests = []
+        for index, path in enumerate(chunk):
+            parent, name = _parent_and_name(path)
+            requests.append(
+                {
+                    "id": str(index),
+                    "method": "POST",
+                    "url": f"/me/drive/items/{folder_ids[parent]}/children",
+                    "headers": {"Content-Type": "application/json"},
+                    "body": {
+                        "name": name,
+                        "folder": {},
+                        "@microsoft.graph.conflictBehavior": "fail",
+                    },
+                }
+            )
+
+        async with self._semaphore:
+            try:
+                response = await self._graph_client.post_batch(requests)
+            except RuntimeError:
+                response = {}
+        responses = {item.get("id"): item for item in response.get("responses", [])}
+
+        for index, path in enumerate(chunk):
+            parent, name = _parent_and_name(path)
+            sub_response = responses.get(str(index), {})
+            body = sub_response.get("body", {})
+            if sub_response.get("status") in (200, 201) and isinstance(body, dict) and "id" in body:
+                self._graph_client.remember_created_folder(folder_ids[parent], body)
+                folder_ids[path] = body["id"]
+                continue
+            # Conflicts, throttling and failed batches fall back to the single-request path,
+            # which retries and resolves folders created concurrently by someone else.
+            folder = await self._graph_client.create_folder(folder_ids[parent], name)
+            folder_ids[path] = folder["id"]
@@ -3,63 +3,110 @@
 from __future__ import annotations
 
 import asyncio
-import hashlib
+import base64
+import binascii
+import copy
 import json
 import os
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional, Union
 from urllib.parse import quote
 
 import aiohttp
 from azure.identity import InteractiveBrowserCredential
 
+from onedrive_helper.batching import BatchedGetQueue
 from onedrive_helper.config import (
     BATCH_LIMIT,
+    CONCURRENCY_MAX,
     FOLDER_CONCURRENCY,
     GRAPH_BASE,
+    HASH_PREFERENCE,
     MEDIA_EXTENSION_ALLOWLIST,
     MEDIA_MIME_PREFIXES,
+    MEDIA_QUEUE_SIZE,
     PAGE_SIZE,
+    REQUEST_TIMEOUT_SECONDS,
     RETRY_CAP,
     RETRY_MAX,
     SCOPES,
+    SERVER_ERROR_STATUSES,
     SMALL_FILE_UPLOAD_BYTES,
-    UPLOAD_CHUNK_SIZE,
+    THROTTLE_STATUSES,
+    UPLOAD_USE_MMAP,
+    UPLOAD_VERIFY_HASHES,
     setup_logging,
 )
+from onedrive_helper.errors import (
+    GraphRequestError,
+    UploadVerificationError,
+    extract_error_message,
+)
+from onedrive_helper.folder_tree import FolderTreeBuilder
+from onedrive_helper.hashing import HashEngine, new_hasher
+from onedrive_helper.resilience import CircuitBreaker, RequestHedger
+from onedrive_helper.singleflight import SingleFlight
+from onedrive_helper.throttle import AdaptiveConcurrencyController
+from onedrive_helper.upload_pipeline import AdaptiveChunkSizer, ChunkReader, ReadBufferPool
+
+if TYPE_CHECKING:
+    from onedrive_helper.drive_index import DriveIndex
+    from onedrive_helper.hash_cache import HashCache
 
 log = setup_logging()
 TOKEN_REFRESH_BUFFER_SECONDS = 60
+REMOTE_HASH_FIELDS = {
+    "sha1": "sha1Hash",
+    "sha256": "sha256Hash",
+    "quickxor": "quickXorHash",
+}
 
 
-class GraphRequestError(RuntimeError):
-    """Graph request failure with status context."""
-
-    def __init__(self, status: int, method: str, url: str, message: str) -> None:
-        super().__init__(f"HTTP {status} [{method}] {url}: {message}")
-        self.status = status
-        self.method = method
-        self.url = url
-        self.message = message
-
-
-class GraphClient:  # pylint: disable=too-many-public-methods
+class GraphClient:  # pylint: disable=too-many-public-methods,too-many-instance-attributes
     """Minimal async Microsoft Graph REST client."""
 
-    def __init__(self, credential: InteractiveBrowserCredential) -> None:
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        credential: InteractiveBrowserCredential,
+        *,
+        hash_cache: Optional[HashCache] = None,
+        direct_child_lookup: bool = False,
+        hedge_reads: bool = False,
+        hash_engine: Optional[HashEngine] = None,
+        graph_base: str = GRAPH_BASE,
+        verify_hashes: tuple[str, ...] = UPLOAD_VERIFY_HASHES,
+        use_mmap: bool = UPLOAD_USE_MMAP,
+    ) -> None:
         self._credential = credential
+        self.graph_base = graph_base.rstrip("/")
+        self._hash_cache = hash_cache
+        self._hash_engine = hash_engine or HashEngine(hash_cache)
+        self._verify_hashes = verify_hashes
+        self._use_mmap = use_mmap
+        self._read_buffers = ReadBufferPool()
+        self._direct_child_lookup = direct_child_lookup
+        self.throttle = AdaptiveConcurrencyController()
+        self._breaker = CircuitBreaker()
+        self._hedger = RequestHedger() if hedge_reads else None
+        self._search_queue = BatchedGetQueue(self)
+        self._single_flight = SingleFlight()
+        self._children_cache: dict[str, dict[str, dict[str, Any]]] = {}
+        self._child_lookup_cache: dict[str, dict[str, Optional[dict[str, Any]]]] = {}
         self._session: Optional[aiohttp.ClientSession] = None
         self._token_headers: Optional[dict[str, str]] = None
         self._token_expires_at: Optional[datetime] = None
         self._token_lock = asyncio.Lock()
 
     async def __aenter__(self) -> "GraphClient":
-        connector = aiohttp.TCPConnector(limit=FOLDER_CONCURRENCY + 4)
-        self._session = aiohttp.ClientSession(connector=connector)
+        connector = aiohttp.TCPConnector(limit=CONCURRENCY_MAX + 4)
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=REQUEST_TIMEOUT_SECONDS)
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
         return self
 
     async def __aexit__(self, *_: object) -> None:
+        self._hash_engine.close()
         if self._session is not None:
             await self._session.close()
 
@@ -107,53 +154,72 @@ class GraphClient:  # pylint: disable=too-many-public-methods
         if self._session is None:
             raise RuntimeError("GraphClient session is not open.")
 
-        delay = 1
         request_headers = headers.copy() if headers else {}
         if auth:
             request_headers.update(await self._auth_headers())
 
+        if method == "GET" and self._hedger is not None:
+            return await self._hedger.run(
+                lambda: self._send_with_retries(method, url, request_headers, kwargs)
+            )
+        return await self._send_with_retries(method, url, request_headers, kwargs)
+
+    async def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        request_headers: dict[str, str],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        delay = 1
         for attempt in range(1, RETRY_MAX + 1):
+            self._breaker.before_request()
             try:
-                async with self._session.request(
+                async with self.throttle.slot(), self._session.request(
                     method,
                     url,
                     headers=request_headers,
                     **kwargs,
                 ) as response:
-                    if response.status == 429:
+                    if response.status in THROTTLE_STATUSES:
                         wait_time = int(response.headers.get("Retry-After", delay))
                         log.warning(
-                            "Rate-limited (429). Waiting %ds [attempt %d/%d].",
-                            wait_time,
-                            attempt,
-                            RETRY_MAX,
-                        )
-                        await asyncio.sleep(wait_time)
-                        delay = min(delay * 2, RETRY_CAP)
-                        continue
-
-                    if response.status in (500, 502, 503, 504):
-                        log.warning(
-                            "Server error %d. Retrying in %ds [attempt %d/%d].",
+                            "Throttled (%d). Pausing all requests for %ds [attempt %d/%d].",
                             response.status,
-                            delay,
+                            wait_time,
                             attempt,
                             RETRY_MAX,
                         )
-                        await asyncio.sleep(delay)
+                        # The shared controller holds every caller until the window has passed.
+                        self.throttle.on_throttle(wait_time)
                         delay = min(delay * 2, RETRY_CAP)
                         continue
 
-                    body = await self._read_body(response)
-                    if response.status >= 400:
-                        message = self._extract_error_message(body)
-                        raise GraphRequestError(response.status, method, url, message)
-                    return body
-            except aiohttp.ClientConnectionError as exc:
+                    if response.status not in SERVER_ERROR_STATUSES:
+                        body = await self._read_body(response)
+                        self.throttle.on_success()
+                        self._breaker.record_success()
+                        if response.status >= 400:
+                            message = extract_error_message(body)
+                            raise GraphRequestError(response.status, method, url, message)
+                        return body
+
+                    log.warning(
+                        "Server error %d. Retrying in %ds [attempt %d/%d].",
+                        response.status,
+                        delay,
+                        attempt,
+                        RETRY_MAX,
+                    )
+                    self._breaker.record_failure()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+                # Stalled responses surface here via the session's read timeout.
+                self._breaker.record_failure()
                 if attempt == RETRY_MAX:
-                    raise RuntimeError(str(exc)) from exc
-                await asyncio.sleep(delay)
-                delay = min(delay * 2, RETRY_CAP)
+                    raise RuntimeError(str(exc) or f"Request timed out: {method} {url}") from exc
+            # Back off outside the request slot so other callers can use it meanwhile.
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RETRY_CAP)
 
         raise RuntimeError(f"All retries exhausted for {method} {url}")
 
@@ -171,34 +237,36 @@ class GraphClient:  # pylint: disable=too-many-public-methods
             return text
 
     @staticmethod
-    def _extract_error_message(body: Any) -> str:
-        if isinstance(body, dict):
-            return body.get("error", {}).get("message", "Graph request failed.")
-        return str(body)
-
-    @staticmethod
-    def compute_hash(filename: str, hash_type: str = "sha256") -> str:
-        """Compute a file hash using the requested algorithm."""
-        hasher = hashlib.new(hash_type)
-        with open(filename, "rb") as file_handle:
-            while chunk := file_handle.read(65536):
-                hasher.update(chunk)
-        return hasher.hexdigest()
+    def _normalize_remote_hash(hash_type: str, value: str) -> str:
+        """Convert a Graph hash value to the lowercase hex form produced by the local hashers."""
+        if hash_type != "quickxor":
+            return value.lower()
+        try:
+            return base64.b64decode(value, validate=True).hex()
+        except (binascii.Error, ValueError):
+            return ""
 
     async def get_url(self, url: str) -> dict[str, Any]:
-        """Issue a GET to an absolute Graph URL."""
-        response = await self._request("GET", url)
+        """Issue a GET to an absolute Graph URL, sharing an identical GET already in flight.
+
+        Callers that shared a GET each get their own copy of the response.
+        """
+        response = await self._single_flight.run(
+            ("GET", url),
+            lambda: self._request("GET", url),
+            copy_result=copy.deepcopy,
+        )
         return response if isinstance(response, dict) else {}
 
     async def get(self, path: str) -> dict[str, Any]:
         """Issue a GET against the Graph base URL."""
-        return await self.get_url(f"{GRAPH_BASE}{path}")
+        return await self.get_url(f"{self.graph_base}{path}")
 
     async def post(self, path: str, body: dict[str, Any]) -> dict[str, Any]:
         """Issue a JSON POST against the Graph base URL."""
         response = await self._request(
             "POST",
-            f"{GRAPH_BASE}{path}",
+            f"{self.graph_base}{path}",
             json=body,
             headers={"Content-Type": "application/json"},
         )
@@ -207,7 +275,7 @@ class GraphClient:  # pylint: disable=too-many-public-methods
     async def put_bytes(
         self,
         url: str,
-        payload: bytes,
+        payload: Union[bytes, memoryview],
         *,
         auth: bool = True,
         headers: Optional[dict[str, str]] = None,
@@ -268,48 +336,109 @@ class GraphClient:  # pylint: disable=too-many-public-methods
                 return None
             raise
 
-    async def search_file(self, file_name: str, file_path: str) -> list[dict[str, Any]]:
-        """Search OneDrive by name and validate size and hash against a local file."""
+    async def search_file(
+        self,
+        file_name: str,
+        file_path: str,
+        drive_index: Optional[DriveIndex] = None,
+    ) -> list[dict[str, Any]]:
+        """Search OneDrive by name and validate size and hash against a local file.
+
+        Searches from concurrent callers are sent together through Graph ``$batch``.
+        When a drive index is supplied, candidates come from the local index instead of
+        the Graph search endpoint, so no request is made.
+        """
+        if drive_index is not None:
+            if not drive_index.has_file_size(os.path.getsize(file_path)):
+                return []
+            return await self.match_local_file(drive_index.lookup(file_name), file_path)
+
         encoded_name = self._encode_odata_search_term(file_name)
         query_url = (
-            f"{GRAPH_BASE}/me/drive/root/search(q='{encoded_name}')"
+            f"/me/drive/root/search(q='{encoded_name}')"
             "?$select=id,name,size,file,parentReference,webUrl"
         )
-        item_list = await self.get_url(query_url)
-        values = item_list.get("value", [])
-        if not values:
+        item_list = await self._search_queue.get(query_url)
+        return await self.match_local_file(item_list.get("value", []), file_path)
+
+    async def match_local_file(
+        self,
+        items: list[dict[str, Any]],
+        file_path: str,
+    ) -> list[dict[str, Any]]:
+        """Return the candidate items whose size and hash match a local file."""
+        if not items:
             return []
 
+        # Only candidates whose size collides with the local file are worth hashing for.
         file_size = os.path.getsize(file_path)
+        candidates = [item for item in items if item.get("size") == file_size]
         matches: list[dict[str, Any]] = []
-        hash_cache: dict[str, str] = {}
-
-        for item in values:
-            if item.get("size") != file_size:
-                continue
+        local_hashes: dict[str, str] = {}
 
+        for item in candidates:
             hashes = item.get("file", {}).get("hashes", {})
-            api_sha256 = hashes.get("sha256Hash", "").lower()
-            api_sha1 = hashes.get("sha1Hash", "").lower()
-
-            if api_sha256 and api_sha256 == await self._get_local_hash(file_path, "sha256", hash_cache):
-                item["cloud_path"] = self.format_item_path(item)
-                matches.append(item)
-            elif api_sha1 and api_sha1 == await self._get_local_hash(file_path, "sha1", hash_cache):
-                item["cloud_path"] = self.format_item_path(item)
+            if await self._local_hash_matches(hashes, file_path, local_hashes):
+                item.setdefault("cloud_path", self.format_item_path(item))
                 matches.append(item)
 
         return matches
 
+    def _select_remote_hash(
+        self,
+        hashes: dict[str, str],
+        file_path: str,
+        local_hashes: dict[str, str],
+    ) -> Optional[tuple[str, str]]:
+        """Pick the cheapest remote hash to verify, preferring digests already known locally."""
+        available = [
+            (hash_type, self._normalize_remote_hash(hash_type, hashes[REMOTE_HASH_FIELDS[hash_type]]))
+            for hash_type in HASH_PREFERENCE
+            if hashes.get(REMOTE_HASH_FIELDS[hash_type])
+        ]
+        if not available:
+            return None
+        for hash_type, remote_digest in available:
+            if hash_type in local_hashes:
+                return hash_type, remote_digest
+        for hash_type, remote_digest in available:
+            cached_digest = self._hash_engine.cached_digest(file_path, hash_type)
+            if cached_digest is not None:
+                local_hashes[hash_type] = cached_digest
+                return hash_type, remote_digest
+        return available[0]
+
+    async def _local_hash_matches(
+        self,
+        hashes: dict[str, str],
+        file_path: str,
+        local_hashes: dict[str, str],
+    ) -> bool:
+        selected = self._select_remote_hash(hashes, file_path, local_hashes)
+        if selected is None:
+            return False
+        hash_type, remote_digest = selected
+        return bool(remote_digest) and remote_digest == await self._get_local_hash(
+            file_path,
+            hash_type,
+            local_hashes,
+        )
+
     async def _get_local_hash(
         self,
         file_path: str,
         hash_type: str,
-        hash_cache: dict[str, str],
+        local_hashes: dict[str, str],
     ) -> str:
-        if hash_type not in hash_cache:
-            hash_cache[hash_type] = await asyncio.to_thread(self.compute_hash, file_path, hash_type)
-        return hash_cache[hash_type]
+        if hash_type not in local_hashes:
+            local_hashes[hash_type] = await self._hash_engine.digest(file_path, hash_type)
+        return local_hashes[hash_type]
+
+    def _children_url(self, item_id: str) -> str:
+        select = "id,name,size,folder,file,parentReference,webUrl"
+        if item_id == "root":
+            return f"{self.graph_base}/me/drive/root/children?$top={PAGE_SIZE}&$select={select}"
+        return f"{self.graph_base}/me/drive/items/{item_id}/children?$top={PAGE_SIZE}&$select={select}"
 
     async def list_children(
         self,
@@ -318,15 +447,7 @@ class GraphClient:  # pylint: disable=too-many-public-methods
         folders_only: bool = False,
     ) -> list[dict[str, Any]]:
         """Return all direct children of a drive item with pagination support."""
-        select = "id,name,size,folder,file,parentReference,webUrl"
-        if item_id == "root":
-            url = f"{GRAPH_BASE}/me/drive/root/children?$top={PAGE_SIZE}&$select={select}"
-        else:
-            url = (
-                f"{GRAPH_BASE}/me/drive/items/{item_id}/children"
-                f"?$top={PAGE_SIZE}&$select={select}"
-            )
-
+        url = self._children_url(item_id)
         items: list[dict[str, Any]] = []
         while url:
             page = await self.get_url(url)
@@ -341,17 +462,90 @@ class GraphClient:  # pylint: disable=too-many-public-methods
         self,
         parent_id: str,
         name: str,
+        *,
+        direct: Optional[bool] = None,
     ) -> Optional[dict[str, Any]]:
-        """Return the direct child of a parent folder by name."""
-        for item in await self.list_children(parent_id):
-            if item.get("name", "").casefold() == name.casefold():
-                return item
-        return None
+        """Return the direct child of a parent folder by name.
+
+        By default each parent is listed once and later lookups are answered from the
+        children cache. In direct mode the child is addressed by path instead, which
+        costs one small GET per name regardless of how large the parent folder is.
+        """
+        key = name.casefold()
+        if parent_id in self._children_cache:
+            return self._children_cache[parent_id].get(key)
+        if direct is None:
+            direct = self._direct_child_lookup
+        if not direct:
+            return (await self.get_children_by_name(parent_id)).get(key)
+
+        lookups = self._child_lookup_cache.setdefault(parent_id, {})
+        if key not in lookups:
+            lookups[key] = await self._get_child_by_path(parent_id, name)
+        return lookups[key]
+
+    async def get_children_by_name(self, parent_id: str) -> dict[str, dict[str, Any]]:
+        """Return the children of a folder keyed by case-folded name, listing it at most once."""
+        if parent_id in self._children_cache:
+            return self._children_cache[parent_id]
+        return await self._single_flight.run(
+            ("cache_children", parent_id),
+            lambda: self._cache_children(parent_id),
+        )
+
+    async def _cache_children(self, parent_id: str) -> dict[str, dict[str, Any]]:
+        children = await self.list_children(parent_id)
+        self._children_cache[parent_id] = {
+            item.get("name", "").casefold(): item for item in children
+        }
+        return self._children_cache[parent_id]
+
+    async def _get_child_by_path(self, parent_id: str, name: str) -> Optional[dict[str, Any]]:
+        encoded_name = quote(name, safe="")
+        try:
+            return await self.get(
+                f"/me/drive/items/{parent_id}:/{encoded_name}"
+                "?$select=id,name,size,file,folder,parentReference,webUrl"
+            )
+        except GraphRequestError as exc:
+            if exc.status == 404:
+                return None
+            raise
+
+    def _remember_child(self, parent_id: str, item: dict[str, Any]) -> None:
+        """Record a created or uploaded item in its parent's cached lookups."""
+        if not item.get("name"):
+            return
+        key = item["name"].casefold()
+        if parent_id in self._children_cache:
+            self._children_cache[parent_id][key] = item
+        if parent_id in self._child_lookup_cache:
+            self._child_lookup_cache[parent_id][key] = item
+
+    def remember_created_folder(self, parent_id: str, folder: dict[str, Any]) -> None:
+        """Record a newly created folder in its parent's cache and cache it as empty."""
+        self._remember_child(parent_id, folder)
+        if "id" in folder:
+            self._children_cache[folder["id"]] = {}
+
+    def forget_children(self, parent_id: str) -> None:
+        """Drop the cached listing and lookups of a parent folder."""
+        self._children_cache.pop(parent_id, None)
+        self._child_lookup_cache.pop(parent_id, None)
 
     async def create_folder(self, parent_id: str, name: str) -> dict[str, Any]:
-        """Create a folder below a given parent folder."""
+        """Create a folder below a given parent folder.
+
+        Concurrent calls for the same parent and name share a single request.
+        """
+        return await self._single_flight.run(
+            ("create_folder", parent_id, name.casefold()),
+            lambda: self._create_folder(parent_id, name),
+        )
+
+    async def _create_folder(self, parent_id: str, name: str) -> dict[str, Any]:
         try:
-            return await self.post(
+            created = await self.post(
                 f"/me/drive/items/{parent_id}/children",
                 {
                     "name": name,
@@ -362,13 +556,24 @@ class GraphClient:  # pylint: disable=too-many-public-methods
         except GraphRequestError as exc:
             if exc.status != 409:
                 raise
+            # Someone else created it since we listed the parent, so the cache is stale.
+            self.forget_children(parent_id)
             existing = await self.get_child_by_name(parent_id, name)
             if existing is None:
                 raise
             return existing
 
+        self.remember_created_folder(parent_id, created)
+        return created
+
     async def ensure_child_folder(self, parent_id: str, name: str) -> dict[str, Any]:
         """Get or create a child folder below a given parent folder."""
+        return await self._single_flight.run(
+            ("ensure_child_folder", parent_id, name.casefold()),
+            lambda: self._ensure_child_folder(parent_id, name),
+        )
+
+    async def _ensure_child_folder(self, parent_id: str, name: str) -> dict[str, Any]:
         existing = await self.get_child_by_name(parent_id, name)
         if existing is not None and "folder" in existing:
             return existing
@@ -383,87 +588,135 @@ class GraphClient:  # pylint: disable=too-many-public-methods
                 raise RuntimeError("Unable to resolve OneDrive root folder.")
             return root_item
 
-        current = await self.get_item_by_path("/")
-        if current is None:
+        existing = await self.get_item_by_path(normalized_path)
+        if existing is not None and "folder" in existing:
+            return existing
+
+        root_item = await self.get_item_by_path("/")
+        if root_item is None:
             raise RuntimeError("Unable to resolve OneDrive root folder.")
+        relative_path = normalized_path.strip("/")
+        folder_ids = await FolderTreeBuilder(self).materialize(root_item["id"], [relative_path])
+        return await self.get_item(folder_ids[relative_path])
+
+    @staticmethod
+    def is_media_item(item: dict[str, Any]) -> bool:
+        """Return whether a drive item is a photo or video file."""
+        if "folder" in item:
+            return False
+        mime_type = item.get("file", {}).get("mimeType", "") or ""
+        name_lower = item.get("name", "").lower()
+        is_media = any(mime_type.startswith(prefix) for prefix in MEDIA_MIME_PREFIXES)
+        return is_media or any(name_lower.endswith(ext) for ext in MEDIA_EXTENSION_ALLOWLIST)
 
-        for part in normalized_path.strip("/").split("/"):
-            current = await self.ensure_child_folder(current["id"], part)
-        return current
+    async def get_latest_delta_link(self, folder_id: str) -> str:
+        """Return a delta link for a folder that reports only changes made from now on."""
+        page = await self.get(f"/me/drive/items/{folder_id}/delta?token=latest")
+        return page.get("@odata.deltaLink", "")
+
+    async def iter_media_changes(
+        self,
+        delta_link: str,
+        cursor: dict[str, str],
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield media items added or changed since a folder delta link was issued.
+
+        Once every page has been read, ``cursor["delta_link"]`` holds the link for
+        the next refresh. An expired link raises ``GraphRequestError`` with status 410.
+        """
+        url = delta_link
+        while url:
+            page = await self.get_url(url)
+            for item in page.get("value", []):
+                if "deleted" not in item and self.is_media_item(item):
+                    yield item
+            if "@odata.deltaLink" in page:
+                cursor["delta_link"] = page["@odata.deltaLink"]
+            url = page.get("@odata.nextLink", "")
 
     async def enumerate_media(
         self,
         folder_id: str,
         folder_path: str = "/",
         counters: Optional[dict[str, int]] = None,
-        semaphore: Optional[asyncio.Semaphore] = None,
     ) -> list[dict[str, Any]]:
-        """Recursively enumerate media items beneath a OneDrive folder."""
-        media_items, counts = await self._enumerate_media(
-            folder_id,
-            folder_path=folder_path,
-            semaphore=semaphore,
-        )
-        if counters is not None:
-            counters["folders"] = counters.get("folders", 0) + counts["folders"]
-            counters["files"] = counters.get("files", 0) + counts["files"]
-        return media_items
+        """Recursively enumerate media items beneath a OneDrive folder into a list."""
+        return [item async for item in self.iter_media(folder_id, folder_path, counters)]
 
-    async def _enumerate_media(  # pylint: disable=too-many-locals
+    async def iter_media(
         self,
         folder_id: str,
-        *,
-        folder_path: str,
-        semaphore: Optional[asyncio.Semaphore] = None,
-    ) -> tuple[list[dict[str, Any]], dict[str, int]]:
-        current_semaphore = semaphore or asyncio.Semaphore(FOLDER_CONCURRENCY)
-        async with current_semaphore:
-            children = await self.list_children(folder_id)
-
-        media_items: list[dict[str, Any]] = []
-        counts = {"folders": 1, "files": 0}
-        sub_tasks: list[asyncio.Task[tuple[list[dict[str, Any]], dict[str, int]]]] = []
-        for item in children:
-            if "folder" in item:
-                child_path = folder_path.rstrip("/") + "/" + item["name"]
-                sub_tasks.append(
-                    asyncio.create_task(
-                        self._enumerate_media(
-                            item["id"],
-                            folder_path=child_path,
-                            semaphore=current_semaphore,
-                        )
+        folder_path: str = "/",
+        counters: Optional[dict[str, int]] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield media items beneath a OneDrive folder as each listing page arrives.
+
+        Folders are crawled by ``FOLDER_CONCURRENCY`` workers, and at most
+        ``MEDIA_QUEUE_SIZE`` discovered items wait for the consumer at any time, so
+        memory stays bounded however large the tree is. ``counters`` receives
+        running ``folders`` and ``files`` totals.
+        """
+        counts = counters if counters is not None else {}
+        counts.setdefault("folders", 0)
+        counts.setdefault("files", 0)
+        folders: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        media: asyncio.Queue[Optional[dict[str, Any]]] = asyncio.Queue(maxsize=MEDIA_QUEUE_SIZE)
+        folders.put_nowait((folder_id, folder_path))
+
+        async def crawl() -> None:
+            while True:
+                current_id, current_path = await folders.get()
+                try:
+                    await self._crawl_media_folder(current_id, current_path, folders, media, counts)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    log.error(
+                        "Failed to enumerate media beneath '%s': %s",
+                        current_path,
+                        exc,
+                        exc_info=(type(exc), exc, exc.__traceback__),
                     )
-                )
-                continue
+                finally:
+                    folders.task_done()
 
-            mime_type = item.get("file", {}).get("mimeType", "") or ""
-            name_lower = item.get("name", "").lower()
-            is_media = any(mime_type.startswith(prefix) for prefix in MEDIA_MIME_PREFIXES)
-            is_allowlisted = any(name_lower.endswith(ext) for ext in MEDIA_EXTENSION_ALLOWLIST)
-            if is_media or is_allowlisted:
-                item["cloud_path"] = self.format_item_path(item)
-                media_items.append(item)
-                counts["files"] += 1
-
-        if not sub_tasks:
-            return media_items, counts
-
-        results = await asyncio.gather(*sub_tasks, return_exceptions=True)
-        for result in results:
-            if isinstance(result, BaseException):
-                log.error(
-                    "Failed to enumerate media beneath '%s': %s",
-                    folder_path,
-                    result,
-                    exc_info=(type(result), result, result.__traceback__),
-                )
-                continue
-            child_items, child_counts = result
-            media_items.extend(child_items)
-            counts["folders"] += child_counts["folders"]
-            counts["files"] += child_counts["files"]
-        return media_items, counts
+        async def finish() -> None:
+            await folders.join()
+            await media.put(None)
+
+        tasks = [asyncio.create_task(crawl()) for _ in range(FOLDER_CONCURRENCY)]
+        tasks.append(asyncio.create_task(finish()))
+        try:
+            while True:
+                item = await media.get()
+                if item is None:
+                    return
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _crawl_media_folder(
+        self,
+        folder_id: str,
+        folder_path: str,
+        folders: asyncio.Queue[tuple[str, str]],
+        media: asyncio.Queue[Optional[dict[str, Any]]],
+        counts: dict[str, int],
+    ) -> None:
+        counts["folders"] += 1
+        url = self._children_url(folder_id)
+        while url:
+            page = await self.get_url(url)
+            for item in page.get("value", []):
+                if "folder" in item:
+                    folders.put_nowait((item["id"], folder_path.rstrip("/") + "/" + item["name"]))
+                    continue
+
+                if self.is_media_item(item):
+                    item["cloud_path"] = self.format_item_path(item)
+                    counts["files"] += 1
+                    await media.put(item)
+            url = page.get("@odata.nextLink", "")
 
     async def browse_for_folder(self) -> Optional[dict[str, str]]:
         """Interactively browse the OneDrive folder tree and select a folder."""
@@ -524,10 +777,20 @@ class GraphClient:  # pylint: disable=too-many-public-methods
             },
         )
 
+    async def list_album_item_ids(self, album_id: str) -> set[str]:
+        """Return the IDs of every item already in an album."""
+        item_ids: set[str] = set()
+        url = f"{self.graph_base}/me/drive/bundles/{album_id}/children?$top={PAGE_SIZE}&$select=id"
+        while url:
+            page = await self.get_url(url)
+            item_ids.update(item["id"] for item in page.get("value", []) if "id" in item)
+            url = page.get("@odata.nextLink", "")
+        return item_ids
+
     async def list_albums(self) -> list[dict[str, str]]:
         """Return existing OneDrive album bundles."""
         albums: list[dict[str, str]] = []
-        url = f"{GRAPH_BASE}/me/drive/bundles?$top={PAGE_SIZE}&$select=id,name,bundle"
+        url = f"{self.graph_base}/me/drive/bundles?$top={PAGE_SIZE}&$select=id,name,bundle"
         while url:
             page = await self.get_url(url)
             for item in page.get("value", []):
@@ -580,20 +843,14 @@ class GraphClient:  # pylint: disable=too-many-public-methods
         candidate = await self.get_child_by_name(parent_id, remote_name)
         if candidate is None or "file" not in candidate:
             return None
-        detailed_item = await self.get_item(candidate["id"])
+        detailed_item = candidate
+        if not candidate["file"].get("hashes"):
+            detailed_item = await self.get_item(candidate["id"])
         if detailed_item.get("size") != os.path.getsize(local_file_path):
             return None
 
         hashes = detailed_item.get("file", {}).get("hashes", {})
-        api_sha256 = hashes.get("sha256Hash", "").lower()
-        api_sha1 = hashes.get("sha1Hash", "").lower()
-        if api_sha256:
-            if api_sha256 != self.compute_hash(local_file_path, "sha256"):
-                return None
-        elif api_sha1:
-            if api_sha1 != self.compute_hash(local_file_path, "sha1"):
-                return None
-        else:
+        if not await self._local_hash_matches(hashes, local_file_path, {}):
             return None
 
         detailed_item["cloud_path"] = self.format_item_path(detailed_item)
@@ -615,32 +872,67 @@ class GraphClient:  # pylint: disable=too-many-public-methods
         if existing is not None:
             return {"status": "skipped", "item": existing}
 
-        file_size = os.path.getsize(local_file_path)
-        if file_size < SMALL_FILE_UPLOAD_BYTES:
-            uploaded_item = await self._simple_upload(local_file_path, remote_parent_id, remote_name)
-        else:
-            uploaded_item = await self._upload_large_file(local_file_path, remote_parent_id, remote_name)
+        hashers = {hash_type: new_hasher(hash_type) for hash_type in self._verify_hashes}
+        with open(local_file_path, "rb") as file_handle:
+            stat_result = os.fstat(file_handle.fileno())
+            with self._read_buffers.borrow(stat_result.st_size) as buffers:
+                reader = ChunkReader(file_handle, hashers, buffers=buffers, use_mmap=self._use_mmap)
+                try:
+                    if stat_result.st_size < SMALL_FILE_UPLOAD_BYTES:
+                        uploaded_item = await self._simple_upload(
+                            reader, stat_result.st_size, remote_parent_id, remote_name
+                        )
+                    else:
+                        uploaded_item = await self._upload_large_file(
+                            reader, stat_result.st_size, remote_parent_id, remote_name
+                        )
+                finally:
+                    await reader.aclose()
+
+        local_digests = reader.hexdigests()
+        self._verify_upload(local_file_path, uploaded_item, local_digests)
+        if self._hash_cache is not None:
+            for hash_type, digest in local_digests.items():
+                self._hash_cache.put(local_file_path, hash_type, digest, stat_result)
         uploaded_item["cloud_path"] = self.format_item_path(uploaded_item)
+        self._remember_child(remote_parent_id, uploaded_item)
         return {"status": "uploaded", "item": uploaded_item}
 
-    async def _simple_upload(
+    def _verify_upload(
         self,
         local_file_path: str,
+        uploaded_item: dict[str, Any],
+        local_digests: dict[str, str],
+    ) -> None:
+        """Compare the digests of the sent bytes with the hashes Graph reports for the new item."""
+        hashes = uploaded_item.get("file", {}).get("hashes", {})
+        for hash_type, local_digest in local_digests.items():
+            remote_value = hashes.get(REMOTE_HASH_FIELDS[hash_type])
+            if not remote_value:
+                continue
+            remote_digest = self._normalize_remote_hash(hash_type, remote_value)
+            if remote_digest != local_digest:
+                raise UploadVerificationError(local_file_path, hash_type, local_digest, remote_digest)
+
+    async def _simple_upload(
+        self,
+        reader: ChunkReader,
+        file_size: int,
         remote_parent_id: str,
         remote_name: str,
     ) -> dict[str, Any]:
-        with open(local_file_path, "rb") as file_handle:
-            payload = file_handle.read()
         encoded_name = quote(remote_name, safe="")
+        reader.prefetch(file_size)
         return await self.put_bytes(
-            f"{GRAPH_BASE}/me/drive/items/{remote_parent_id}:/{encoded_name}:/content",
-            payload,
+            f"{self.graph_base}/me/drive/items/{remote_parent_id}:/{encoded_name}:/content",
+            await reader.next_chunk(),
             headers={"Content-Type": "application/octet-stream"},
         )
 
     async def _upload_large_file(
         self,
-        local_file_path: str,
+        reader: ChunkReader,
+        file_size: int,
         remote_parent_id: str,
         remote_name: str,
     ) -> dict[str, Any]:
@@ -650,24 +942,32 @@ class GraphClient:  # pylint: disable=too-many-public-methods
             {"item": {"@microsoft.graph.conflictBehavior": "replace", "name": remote_name}},
         )
         upload_url = upload_session["uploadUrl"]
-        file_size = os.path.getsize(local_file_path)
         uploaded_item: dict[str, Any] = {}
-
-        with open(local_file_path, "rb") as file_handle:
-            start = 0
-            while start < file_size:
-                chunk = file_handle.read(UPLOAD_CHUNK_SIZE)
-                end = start + len(chunk) - 1
-                response = await self.put_bytes(
-                    upload_url,
-                    chunk,
-                    auth=False,
-                    headers={
-                        "Content-Length": str(len(chunk)),
-                        "Content-Range": f"bytes {start}-{end}/{file_size}",
-                    },
-                )
-                if "id" in response:
-                    uploaded_item = response
-                start = end + 1
+        chunk_sizer = AdaptiveChunkSizer()
+
+        reader.prefetch(min(chunk_sizer.size, file_size))
+        start = 0
+        while start < file_size:
+            chunk = await reader.next_chunk()
+            if not chunk:
+                raise RuntimeError(f"File shrank during upload of '{remote_name}'.")
+            end = start + len(chunk) - 1
+            if end + 1 < file_size:
+                # Read the next chunk from disk while this one is on the wire.
+                reader.prefetch(min(chunk_sizer.size, file_size - end - 1))
+            sent_at = time.monotonic()
+            response = await self.put_bytes(
+                upload_url,
+                chunk,
+                auth=False,
+                headers={
+                    "Content-Length": str(len(chunk)),
+                    "Content-Range": f"bytes {start}-{end}/{file_size}",
+                },
+            )
+            if end + 1 < file_size:
+                chunk_sizer.record(len(chunk), time.monotonic() - sent_at)
+            if "id" in response:
+                uploaded_item = response
+            start = end + 1
         return uploaded_item
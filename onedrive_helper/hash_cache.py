@@ -0,0 +1,119 @@
+"""Persistent cache of local file digests keyed by path, size, mtime and inode."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+from onedrive_helper.config import HASH_CACHE_FILE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT NOT NULL,
+    hash_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (path, hash_type)
+);
+"""
+
+
+def _stat_key(stat_result: os.stat_result) -> tuple[int, int, int]:
+    return stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino
+
+
+class HashCache:
+    """Thread-safe SQLite store of file digests that is invalidated by file changes."""
+
+    def __init__(self, path: str = HASH_CACHE_FILE) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Commit pending changes and close the database."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def get(self, file_path: str, hash_type: str) -> Optional[str]:
+        """Return a cached digest if the file has not changed since it was hashed."""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, mtime_ns, inode, digest FROM hashes WHERE path = ? AND hash_type = ?",
+                (key, hash_type),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            current = _stat_key(os.stat(key))
+        except OSError:
+            return None
+        return row[3] if tuple(row[:3]) == current else None
+
+    def put(
+        self,
+        file_path: str,
+        hash_type: str,
+        digest: str,
+        stat_result: os.stat_result,
+    ) -> None:
+        """Store a digest computed from the file state captured in ``stat_result``."""
+        key = os.path.abspath(file_path)
+        try:
+            if _stat_key(os.stat(key)) != _stat_key(stat_result):
+                # The file changed while it was being hashed; the digest is not trustworthy.
+                return
+        except OSError:
+            return
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO hashes (path, hash_type, size, mtime_ns, inode, digest) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, hash_type, *_stat_key(stat_result), digest),
+            )
+            self._connection.commit()
+
+    def evict_stale(self, root: Optional[str] = None) -> int:
+        """Delete entries for files that were removed or changed, optionally below a root."""
+        query = "SELECT path, hash_type, size, mtime_ns, inode FROM hashes"
+        params: tuple[object, ...] = ()
+        if root is not None:
+            prefix = os.path.join(os.path.abspath(root), "")
+            query += " WHERE substr(path, 1, ?) = ?"
+            params = (len(prefix), prefix)
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+
+        stale_entries: list[tuple[str, str]] = []
+        for path, hash_type, size, mtime_ns, inode in rows:
+            try:
+                if _stat_key(os.stat(path)) == (size, mtime_ns, inode):
+                    continue
+            except OSError:
+                pass
+            stale_entries.append((path, hash_type))
+
+        with self._lock:
+            self._connection.executemany(
+                "DELETE FROM hashes WHERE path = ? AND hash_type = ?",
+                stale_entries,
+            )
+            self._connection.commit()
+        return len(stale_entries)
@@ -0,0 +1,95 @@
+"""Local file hashing on a dedicated worker pool."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Optional
+
+from onedrive_helper.config import HASH_READ_SIZE, HASH_WORKERS
+from onedrive_helper.quickxor import QuickXorHash
+
+if TYPE_CHECKING:
+    from onedrive_helper.hash_cache import HashCache
+
+
+def new_hasher(hash_type: str) -> Any:
+    """Return an incremental hasher for a local hash type name."""
+    if hash_type == "quickxor":
+        return QuickXorHash()
+    return hashlib.new(hash_type)
+
+
+def hash_file(filename: str, hash_type: str) -> tuple[str, os.stat_result]:
+    """Hash a file and return the hex digest with the stat taken before reading it."""
+    stat_result = os.stat(filename)
+    hasher = new_hasher(hash_type)
+    with open(filename, "rb") as file_handle:
+        while chunk := file_handle.read(HASH_READ_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest(), stat_result
+
+
+class HashEngine:
+    """Hash local files on a bounded pool that is separate from the default executor.
+
+    Hashing never competes with other ``asyncio.to_thread`` work such as token
+    refreshes and directory walks. ``workers`` should match what the disks can
+    serve in parallel. A process pool avoids the GIL for QuickXorHash, which is
+    computed in Python, while a thread pool suits the C-implemented SHA digests.
+    The hash cache is consulted and updated on the event loop, so only paths and
+    digests cross the pool boundary.
+    """
+
+    def __init__(
+        self,
+        hash_cache: Optional[HashCache] = None,
+        *,
+        workers: int = HASH_WORKERS,
+        use_processes: bool = False,
+    ) -> None:
+        self._hash_cache = hash_cache
+        self._workers = max(1, workers)
+        self._use_processes = use_processes
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._workers,
+                    thread_name_prefix="hash",
+                )
+        return self._executor
+
+    def close(self) -> None:
+        """Stop the worker pool, dropping hashes that have not started yet."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def cached_digest(self, file_path: str, hash_type: str) -> Optional[str]:
+        """Return a digest from the hash cache without hashing, if one is valid."""
+        if self._hash_cache is None:
+            return None
+        return self._hash_cache.get(file_path, hash_type)
+
+    async def digest(self, file_path: str, hash_type: str) -> str:
+        """Return the hex digest of a file, from the cache or computed on the pool."""
+        cached = self.cached_digest(file_path, hash_type)
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        digest, stat_result = await loop.run_in_executor(
+            self._get_executor(),
+            hash_file,
+            file_path,
+            hash_type,
+        )
+        if self._hash_cache is not None:
+            self._hash_cache.put(file_path, hash_type, digest, stat_result)
+        return digest
@@ -0,0 +1,108 @@
+"""Walk local folder trees with ``os.scandir`` off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from itertools import islice
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from onedrive_helper.config import WALK_BATCH_SIZE
+
+LocalFile = tuple[Path, os.stat_result]
+Job = TypeVar("Job")
+
+
+def iter_local_files(root: Path, include: Callable[[Path], bool]) -> Iterator[LocalFile]:
+    """Yield ``(path, stat)`` for every included regular file below ``root``.
+
+    Like ``Path.rglob``, symlinked directories are not descended into, while
+    symlinked files are reported with the stat of their target. Folders that
+    cannot be read are skipped.
+    """
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(Path(entry.path))
+                            continue
+                        if not entry.is_file():
+                            continue
+                        path = Path(entry.path)
+                        if include(path):
+                            yield path, entry.stat()
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+async def walk_local_files(
+    root: Path,
+    include: Callable[[Path], bool],
+    queue: asyncio.Queue[Optional[LocalFile]],
+) -> None:
+    """Feed every included file below ``root`` into a bounded queue.
+
+    Directory reads and ``stat`` calls run in a worker thread in slices of
+    ``WALK_BATCH_SIZE`` files, so the event loop only hands results on and the
+    queue's bound throttles the walk to the pace of its consumers.
+    """
+    files = iter_local_files(root, include)
+    while True:
+        batch = await asyncio.to_thread(lambda: list(islice(files, WALK_BATCH_SIZE)))
+        if not batch:
+            return
+        for local_file in batch:
+            await queue.put(local_file)
+
+
+@asynccontextmanager
+async def worker_pool(
+    queue: asyncio.Queue[Optional[Job]],
+    handle: Callable[[Job], Awaitable[None]],
+    size: int,
+) -> AsyncIterator[None]:
+    """Run ``size`` tasks that pass each queued job to ``handle`` until the block exits.
+
+    On exit every task gets a ``None`` sentinel, and the block only returns once
+    the jobs queued before it have all been handled. When a handler raises, the
+    other tasks and the block itself are cancelled and that error is re-raised,
+    so a producer never waits on a queue that nothing drains any more.
+    """
+    producer = asyncio.current_task()
+    errors: list[BaseException] = []
+
+    async def drain() -> None:
+        while (job := await queue.get()) is not None:
+            await handle(job)
+
+    def stop_on_error(worker: asyncio.Task) -> None:
+        if worker.cancelled() or worker.exception() is None or errors:
+            return
+        errors.append(worker.exception())
+        for other in workers:
+            other.cancel()
+        producer.cancel()
+
+    workers = [asyncio.create_task(drain()) for _ in range(size)]
+    for worker in workers:
+        worker.add_done_callback(stop_on_error)
+    try:
+        yield
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    except asyncio.CancelledError:
+        if errors:
+            raise errors[0] from None
+        raise
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
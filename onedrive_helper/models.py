@@ -18,6 +18,7 @@ class FileStatus:
     size: int = 0
     cloud_path: Optional[str] = None
     message: Optional[str] = None
+    backup_strategy: Optional[str] = None
 
 
 @dataclass
@@ -75,6 +76,7 @@ class SyncScanReport:
     unsynced_files: int = 0
     synced_bytes: int = 0
     unsynced_bytes: int = 0
+    reused_files: int = 0
     synced: list[FileStatus] = field(default_factory=list)
     unsynced: list[FileStatus] = field(default_factory=list)
     errors: list[str] = field(default_factory=list)
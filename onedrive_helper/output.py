@@ -58,6 +58,8 @@ def print_result(value: Any) -> None:
         print(f"Total files: {value.total_files}")
         print(f"Synced files: {value.synced_files}")
         print(f"Unsynced files: {value.unsynced_files}")
+        if value.reused_files:
+            print(f"Reused from snapshot: {value.reused_files}")
         print(f"Synced bytes: {value.synced_bytes}")
         print(f"Unsynced bytes: {value.unsynced_bytes}")
     else:
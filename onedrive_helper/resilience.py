@@ -0,0 +1,144 @@
+"""Tail-latency and outage handling for Graph requests: hedged reads and a circuit breaker."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from onedrive_helper.config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+    HEDGE_BUDGET_RATIO,
+    HEDGE_INITIAL_DELAY,
+    HEDGE_LATENCY_WINDOW,
+    HEDGE_MIN_DELAY,
+    setup_logging,
+)
+from onedrive_helper.errors import CircuitOpenError, GraphRequestError
+
+log = setup_logging()
+T = TypeVar("T")
+MIN_LATENCY_SAMPLES = 20
+
+
+class RequestHedger:
+    """Send a duplicate of a slow idempotent request and keep whichever answer arrives first.
+
+    The hedge delay is the p95 of recently observed latencies, so only the slowest
+    few percent of requests are duplicated, and the number of hedges is capped at
+    ``budget_ratio`` of all requests so an overloaded server is not hit twice as hard.
+    """
+
+    def __init__(
+        self,
+        window: int = HEDGE_LATENCY_WINDOW,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+    ) -> None:
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._budget_ratio = budget_ratio
+        self.requests = 0
+        self.hedges = 0
+
+    def delay(self) -> float:
+        """Return how long to wait for the first attempt before hedging."""
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return HEDGE_INITIAL_DELAY
+        ordered = sorted(self._latencies)
+        p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+        return max(HEDGE_MIN_DELAY, p95)
+
+    async def _timed(self, send: Callable[[], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        result = await send()
+        self._latencies.append(time.monotonic() - started)
+        return result
+
+    async def run(self, send: Callable[[], Awaitable[T]]) -> T:
+        """Await ``send()``, starting one duplicate if it is slower than the hedge delay."""
+        self.requests += 1
+        pending = {asyncio.create_task(self._timed(send))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.delay())
+            if not done and self.hedges < self._budget_ratio * self.requests:
+                self.hedges += 1
+                pending.add(asyncio.create_task(self._timed(send)))
+            first_error: Optional[BaseException] = None
+            while done or pending:
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    if isinstance(error, GraphRequestError):
+                        # Graph answered definitively; a duplicate would get the same answer.
+                        raise error
+                    first_error = first_error or error
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            assert first_error is not None
+            raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class CircuitBreaker:
+    """Fail fast once requests keep failing, instead of retrying every call to exhaustion.
+
+    After ``threshold`` consecutive failed attempts the circuit opens and requests
+    raise ``CircuitOpenError`` without being sent. Once ``reset_seconds`` have passed
+    a single probe request is let through; its success closes the circuit and its
+    failure keeps it open for another period.
+    """
+
+    def __init__(
+        self,
+        threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+    ) -> None:
+        self._threshold = threshold
+        self._reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether requests are currently being refused."""
+        return self._opened_at is not None
+
+    def before_request(self) -> None:
+        """Raise ``CircuitOpenError`` unless this request may be sent."""
+        if self._opened_at is None:
+            return
+        now = time.monotonic()
+        retry_in = self._opened_at + self._reset_seconds - now
+        probing = self._probe_started is not None and now - self._probe_started < self._reset_seconds
+        if retry_in > 0 or probing:
+            raise CircuitOpenError(max(retry_in, 0.0))
+        self._probe_started = now
+
+    def record_success(self) -> None:
+        """Close the circuit after a request reached a healthy server."""
+        if self._opened_at is not None:
+            log.info("Graph requests are succeeding again; circuit closed.")
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Count a failed attempt and open the circuit once the threshold is reached."""
+        self._failures += 1
+        if self._probe_started is not None or (
+            self._opened_at is None and self._failures >= self._threshold
+        ):
+            log.warning(
+                "%d consecutive Graph request failures; failing fast for %ds.",
+                self._failures,
+                self._reset_seconds,
+            )
+            self._opened_at = time.monotonic()
+            self._probe_started = None
@@ -0,0 +1,103 @@
+"""Persistent record of earlier scan verdicts keyed by path, size and mtime."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import uuid
+from typing import Optional
+
+from onedrive_helper.config import SCAN_SNAPSHOT_FILE
+
+_SCHEMA = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    cloud_path TEXT,
+    run_id TEXT NOT NULL
+);
+"""
+_FLUSH_ROWS = 1000
+
+
+class ScanSnapshot:
+    """SQLite store of the last scan verdict for every local file.
+
+    A ``synced`` verdict is reused while the file's size and modification time
+    are unchanged. Entries are written in batches, and ``finish`` drops entries
+    below the scanned root that were not seen in the current run.
+    """
+
+    def __init__(self, path: str = SCAN_SNAPSHOT_FILE) -> None:
+        self.path = path
+        self._run_id = uuid.uuid4().hex
+        self._pending: list[tuple[str, int, int, str, Optional[str], str]] = []
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ScanSnapshot":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Write pending entries and close the database."""
+        self._flush()
+        self._connection.close()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, status, cloud_path, run_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            self._pending,
+        )
+        self._connection.commit()
+        self._pending.clear()
+
+    def synced_cloud_path(self, file_path: str, stat_result: os.stat_result) -> Optional[str]:
+        """Return the recorded cloud path if the unchanged file was synced last time.
+
+        A reused entry is also marked as seen in the current run.
+        """
+        row = self._connection.execute(
+            "SELECT size, mtime_ns, status, cloud_path FROM files WHERE path = ?",
+            (file_path,),
+        ).fetchone()
+        if row is None or row[2] != "synced":
+            return None
+        if (row[0], row[1]) != (stat_result.st_size, stat_result.st_mtime_ns):
+            return None
+        self.record(file_path, stat_result, "synced", row[3])
+        return row[3] or ""
+
+    def record(
+        self,
+        file_path: str,
+        stat_result: os.stat_result,
+        status: str,
+        cloud_path: Optional[str],
+    ) -> None:
+        """Remember the verdict for a file in its state captured by ``stat_result``."""
+        self._pending.append(
+            (file_path, stat_result.st_size, stat_result.st_mtime_ns, status, cloud_path, self._run_id)
+        )
+        if len(self._pending) >= _FLUSH_ROWS:
+            self._flush()
+
+    def finish(self, root: str) -> int:
+        """Delete entries below ``root`` that the current run did not see; return the count."""
+        self._flush()
+        prefix = os.path.join(os.path.abspath(root), "")
+        cursor = self._connection.execute(
+            "DELETE FROM files WHERE substr(path, 1, ?) = ? AND run_id != ?",
+            (len(prefix), prefix, self._run_id),
+        )
+        self._connection.commit()
+        return cursor.rowcount
@@ -4,24 +4,31 @@
 
 from __future__ import annotations
 
-import json
-import os
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import asyncio
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
-from onedrive_helper.config import BATCH_LIMIT
+from onedrive_helper.album_journal import (
+    AlbumJournal,
+    AlbumState,
+    load_album_state,
+    load_delta_link,
+    save_delta_link,
+)
+from onedrive_helper.config import (
+    ALBUM_BATCH_IN_FLIGHT,
+    BATCH_LIMIT,
+    RETRY_CAP,
+    RETRY_MAX,
+    RETRYABLE_STATUSES,
+    THROTTLE_STATUSES,
+    setup_logging,
+)
+from onedrive_helper.errors import GraphRequestError
+from onedrive_helper.local_walk import worker_pool
 from onedrive_helper.models import AlbumCreationResult
 
-
-@dataclass
-class AlbumState:
-    """Persisted resume metadata for album creation."""
-
-    album_id: Optional[str]
-    added_ids: set[str]
-    source_folder: Optional[dict[str, str]]
+log = setup_logging()
 
 
 class AlbumCreatorService:
@@ -33,85 +40,188 @@ class AlbumCreatorService:
     @staticmethod
     def _default_state_path(album_id: str) -> str:
         short_id = album_id.replace("-", "")[:12]
-        return f".album_state_{short_id}.json"
+        return f".album_state_{short_id}.jsonl"
+
+    async def _prepare_existing_album(  # pylint: disable=too-many-arguments
+        self,
+        album_id: Optional[str],
+        source_folder: dict[str, str],
+        resume_state: AlbumState,
+        *,
+        use_delta: bool,
+        list_album: bool,
+    ) -> Optional[str]:
+        """Return the stored delta link for an existing album, or record its current items."""
+        if album_id is None:
+            return None
+        delta_link = load_delta_link(album_id, source_folder["id"]) if use_delta else None
+        if delta_link:
+            log.info("Refreshing '%s' from its stored delta link.", source_folder["path"])
+        elif list_album:
+            album_item_ids = await self._graph_client.list_album_item_ids(album_id)
+            log.info("Album already holds %d items; only missing items are added.", len(album_item_ids))
+            resume_state.added_ids.update(album_item_ids)
+        return delta_link
+
+    async def _latest_delta_link(self, source_folder: dict[str, str]) -> str:
+        """Return a delta link for the folder's current state, or ``""`` if Graph offers none."""
+        try:
+            return await self._graph_client.get_latest_delta_link(source_folder["id"])
+        except GraphRequestError as exc:
+            # Business and SharePoint drives only support delta on the drive root.
+            log.warning("No delta link for '%s': %s", source_folder["path"], exc)
+            return ""
+
+    async def _media_stream(
+        self,
+        source_folder: dict[str, str],
+        delta_link: Optional[str],
+        cursor: dict[str, str],
+        *,
+        record_delta: bool,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield media changed since ``delta_link``, or every media item when there is none.
+
+        With ``record_delta``, a full enumeration first records a delta link for the
+        current state, so the next refresh only has to fetch what changes from here on.
+        """
+        seen: set[str] = set()
+        if delta_link:
+            try:
+                async for item in self._graph_client.iter_media_changes(delta_link, cursor):
+                    seen.add(item["id"])
+                    yield item
+                return
+            except GraphRequestError as exc:
+                log.warning(
+                    "Delta link for '%s' failed (%s); enumerating the whole folder.",
+                    source_folder["path"],
+                    exc,
+                )
+                cursor.pop("delta_link", None)
+        if record_delta:
+            cursor["delta_link"] = await self._latest_delta_link(source_folder)
+        async for item in self._graph_client.iter_media(source_folder["id"], source_folder["path"]):
+            if item["id"] not in seen:
+                yield item
 
     @staticmethod
-    def _load_state(path: str) -> AlbumState:
-        if not os.path.exists(path):
-            return AlbumState(album_id=None, added_ids=set(), source_folder=None)
-        with open(path, encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-        source_folder = data.get("source_folder")
-        if not isinstance(source_folder, dict):
-            source_folder = None
-        return AlbumState(
-            album_id=data.get("album_id"),
-            added_ids=set(data.get("added_ids", [])),
-            source_folder=source_folder,
-        )
+    async def _pending_batches(
+        media_items: AsyncIterator[dict[str, Any]],
+        already_added: set[str],
+        result: AlbumCreationResult,
+    ) -> AsyncIterator[list[str]]:
+        """Group streamed media items not yet in the album into ``BATCH_LIMIT`` ID lists."""
+        chunk: list[str] = []
+        async for item in media_items:
+            result.total_discovered += 1
+            if item["id"] in already_added:
+                result.pre_existing_skip += 1
+                continue
+            chunk.append(item["id"])
+            if len(chunk) == BATCH_LIMIT:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
     @staticmethod
-    def _save_state(
-        path: str,
+    async def _prepend(first: list[str], rest: AsyncIterator[list[str]]) -> AsyncIterator[list[str]]:
+        yield first
+        async for chunk in rest:
+            yield chunk
+
+    async def _post_chunk(
+        self,
         album_id: str,
-        added_ids: set[str],
-        source_folder: dict[str, str],
-    ) -> None:
-        temp_path = path + ".tmp"
-        payload = {
-            "album_id": album_id,
-            "added_ids": sorted(added_ids),
-            "source_folder": source_folder,
-            "updated_at": datetime.now(timezone.utc).isoformat(),
-        }
-        with open(temp_path, "w", encoding="utf-8") as file_handle:
-            json.dump(payload, file_handle, indent=2)
-        os.replace(temp_path, path)
-
-    async def _add_items(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+        chunk: list[str],
+    ) -> tuple[list[str], list[str], int]:
+        """Post one album batch and return the added IDs, retryable IDs and their delay.
+
+        Raises ``RuntimeError`` when the batch request itself fails.
+        """
+        requests = [
+            {
+                "id": str(index),
+                "method": "POST",
+                "url": f"/me/drive/bundles/{album_id}/children",
+                "headers": {"Content-Type": "application/json"},
+                "body": {"id": item_id},
+            }
+            for index, item_id in enumerate(chunk)
+        ]
+        response = await self._graph_client.post_batch(requests)
+        responses = {item.get("id"): item for item in response.get("responses", [])}
+
+        added: list[str] = []
+        retries: list[str] = []
+        retry_after = 0
+        for index, item_id in enumerate(chunk):
+            sub_response = responses.get(str(index), {})
+            status = sub_response.get("status", 0)
+            if status in (200, 201, 204, 409):
+                added.append(item_id)
+            elif not sub_response or status in RETRYABLE_STATUSES:
+                retries.append(item_id)
+                retry_after = max(
+                    retry_after,
+                    int(sub_response.get("headers", {}).get("Retry-After", 1)),
+                )
+                if status in THROTTLE_STATUSES:
+                    self._graph_client.throttle.on_throttle(retry_after)
+        return added, retries, retry_after
+
+    async def _add_chunk(
         self,
         album_id: str,
-        item_ids: list[str],
-        already_added: set[str],
-        state_path: str,
-        source_folder: dict[str, str],
-    ) -> tuple[int, int]:
-        pending = [item_id for item_id in item_ids if item_id not in already_added]
-        success_count = 0
-        failure_count = 0
-
-        for batch_start in range(0, len(pending), BATCH_LIMIT):
-            chunk = pending[batch_start : batch_start + BATCH_LIMIT]
-            requests = [
-                {
-                    "id": str(index),
-                    "method": "POST",
-                    "url": f"/me/drive/bundles/{album_id}/children",
-                    "headers": {"Content-Type": "application/json"},
-                    "body": {"id": item_id},
-                }
-                for index, item_id in enumerate(chunk)
-            ]
+        chunk: list[str],
+        journal: AlbumJournal,
+        counts: dict[str, int],
+    ) -> None:
+        """Add one batch, resending throttled or failed sub-requests on their own."""
+        for attempt in range(1, RETRY_MAX + 1):
             try:
-                response = await self._graph_client.post_batch(requests)
+                added, retries, retry_after = await self._post_chunk(album_id, chunk)
             except RuntimeError:
-                failure_count += len(chunk)
-                self._save_state(state_path, album_id, already_added, source_folder)
-                continue
+                counts["failed"] += len(chunk)
+                journal.append([])
+                return
+            journal.append(added)
+            counts["added"] += len(added)
+            failed = len(chunk) - len(added) - len(retries)
+            counts["failed"] += failed
+            if not retries:
+                return
+            if attempt == RETRY_MAX:
+                counts["failed"] += len(retries)
+                return
+            log.warning(
+                "%d album additions throttled or failed. Retrying in %ds [attempt %d/%d].",
+                len(retries),
+                retry_after,
+                attempt,
+                RETRY_MAX,
+            )
+            await asyncio.sleep(min(retry_after, RETRY_CAP))
+            chunk = retries
 
-            for item in response.get("responses", []):
-                request_index = int(item.get("id", -1))
-                if request_index < 0 or request_index >= len(chunk):
-                    continue
-                item_id = chunk[request_index]
-                status = item.get("status", 0)
-                if status in (200, 201, 204, 409):
-                    already_added.add(item_id)
-                    success_count += 1
-                else:
-                    failure_count += 1
-            self._save_state(state_path, album_id, already_added, source_folder)
-        return success_count, failure_count
+    async def _add_items(
+        self,
+        album_id: str,
+        batches: AsyncIterator[list[str]],
+        journal: AlbumJournal,
+    ) -> tuple[int, int]:
+        """Add batches with up to ``ALBUM_BATCH_IN_FLIGHT`` ``$batch`` posts in flight."""
+        counts = {"added": 0, "failed": 0}
+        queue: asyncio.Queue[Optional[list[str]]] = asyncio.Queue(maxsize=ALBUM_BATCH_IN_FLIGHT)
+
+        async def add_chunk(chunk: list[str]) -> None:
+            await self._add_chunk(album_id, chunk, journal, counts)
+
+        async with worker_pool(queue, add_chunk, ALBUM_BATCH_IN_FLIGHT):
+            async for chunk in batches:
+                await queue.put(chunk)
+        return counts["added"], counts["failed"]
 
     async def run(  # pylint: disable=too-many-arguments,too-many-locals
         self,
@@ -121,11 +231,12 @@ class AlbumCreatorService:
         album_id: Optional[str] = None,
         dry_run: bool = False,
         resume_path: Optional[str] = None,
+        full_scan: bool = False,
     ) -> AlbumCreationResult:
         """Create or update an album using a selected OneDrive folder."""
         resume_state = AlbumState(album_id=None, added_ids=set(), source_folder=None)
         if resume_path:
-            resume_state = self._load_state(resume_path)
+            resume_state = load_album_state(resume_path)
         if source_folder is None:
             source_folder = resume_state.source_folder
         if source_folder is None:
@@ -134,24 +245,38 @@ class AlbumCreatorService:
         resolved_album_id = resume_state.album_id or album_id
         default_album_name = f"{source_folder['name']} Album"
         resolved_album_name = album_name or default_album_name
-        counters = {"folders": 0, "files": 0}
-        media_items = await self._graph_client.enumerate_media(
-            source_folder["id"],
-            source_folder["path"],
-            counters=counters,
-        )
-
         result = AlbumCreationResult(
             source_folder_id=source_folder["id"],
             source_folder_path=source_folder["path"],
             source_folder_name=source_folder["name"],
             album_id=resolved_album_id,
             album_name=resolved_album_name,
-            total_discovered=len(media_items),
-            pre_existing_skip=len(resume_state.added_ids),
             dry_run=dry_run,
         )
-        if dry_run or not media_items:
+        delta_link = await self._prepare_existing_album(
+            resolved_album_id,
+            source_folder,
+            resume_state,
+            use_delta=not full_scan,
+            list_album=not resume_path,
+        )
+        cursor: dict[str, str] = {}
+        media_items = self._media_stream(
+            source_folder,
+            delta_link,
+            cursor,
+            record_delta=not (full_scan or dry_run),
+        )
+        batches = self._pending_batches(media_items, resume_state.added_ids, result)
+        try:
+            first_batch = await batches.__anext__()
+        except StopAsyncIteration:
+            first_batch = None
+        if dry_run or first_batch is None:
+            async for _ in batches:
+                pass
+            if not dry_run and resolved_album_id is not None and cursor.get("delta_link"):
+                save_delta_link(resolved_album_id, source_folder["id"], cursor["delta_link"])
             return result
 
         if resolved_album_id is None:
@@ -160,21 +285,28 @@ class AlbumCreatorService:
             resolved_album_name = album.get("name", resolved_album_name)
 
         state_path = resume_path or self._default_state_path(resolved_album_id)
-        item_ids = [item["id"] for item in media_items]
-        added_files, failed_files = await self._add_items(
-            resolved_album_id,
-            item_ids,
-            resume_state.added_ids,
+        with AlbumJournal(
             state_path,
+            resolved_album_id,
             source_folder,
-        )
+            resume_state.added_ids,
+        ) as journal:
+            added_files, failed_files = await self._add_items(
+                resolved_album_id,
+                self._prepend(first_batch, batches),
+                journal,
+            )
 
         result.album_id = resolved_album_id
         result.album_name = resolved_album_name
         result.added_files = added_files
         result.failed_files = failed_files
         result.state_path = state_path
-        if failed_files == 0 and Path(state_path).exists():
-            Path(state_path).unlink()
-            result.state_path = None
+        if failed_files == 0:
+            # Only advance the delta link once every change it covers is in the album.
+            if cursor.get("delta_link"):
+                save_delta_link(resolved_album_id, source_folder["id"], cursor["delta_link"])
+            if Path(state_path).exists():
+                Path(state_path).unlink()
+                result.state_path = None
         return result
@@ -4,30 +4,104 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
-from onedrive_helper.config import VALID_MEDIA_SUFFIXES
+from onedrive_helper.backup import backup_file
+from onedrive_helper.config import (
+    CLEANUP_IO_WORKERS,
+    SCAN_CONCURRENCY,
+    SCAN_QUEUE_SIZE,
+    VALID_MEDIA_SUFFIXES,
+)
+from onedrive_helper.local_walk import LocalFile, walk_local_files, worker_pool
 from onedrive_helper.models import DiskCleanupResult, FileStatus
 
 
 class DiskCleanupService:
     """Delete local files that already exist on OneDrive."""
 
-    def __init__(self, graph_client) -> None:
+    def __init__(self, graph_client, drive_index=None, backup_strategy: str = "auto") -> None:
         self._graph_client = graph_client
+        self._drive_index = drive_index
+        self._backup_strategy = backup_strategy
 
     @staticmethod
     def _should_include(path: Path) -> bool:
         return path.suffix.lower() in VALID_MEDIA_SUFFIXES
 
-    @staticmethod
-    def _backup_file(path: Path, local_path: Path, backup_path: Path) -> None:
+    def _backup_file(self, path: Path, local_path: Path, backup_path: Path) -> str:
         relative_path = path.relative_to(local_path)
-        backup_file_path = backup_path / relative_path
-        backup_file_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(path, backup_file_path)
+        return backup_file(path, backup_path / relative_path, self._backup_strategy)
+
+    async def _match_file(
+        self,
+        local_file: LocalFile,
+        matched: asyncio.Queue[Optional[FileStatus]],
+        result: DiskCleanupResult,
+    ) -> None:
+        path, stat_result = local_file
+        result.scanned_files += 1
+        file_status = FileStatus(
+            name=path.name,
+            local_path=str(path),
+            size=stat_result.st_size,
+            status="skipped",
+        )
+        try:
+            matches = await self._graph_client.search_file(
+                path.name, str(path), self._drive_index
+            )
+        except (OSError, RuntimeError) as exc:
+            result.errors.append(f"{path}: {exc}")
+            file_status.status = "error"
+            file_status.message = str(exc)
+            result.files.append(file_status)
+            return
+
+        if not matches:
+            result.skipped_files += 1
+            result.files.append(file_status)
+            return
+        file_status.cloud_path = matches[0].get("cloud_path")
+        await matched.put(file_status)
+
+    def _remove_file(self, file_status: FileStatus, local_root: Path, backup_root: Optional[Path]) -> None:
+        """Back up and delete one file, recording the backup strategy that was used."""
+        path = Path(file_status.local_path)
+        if backup_root is not None:
+            file_status.backup_strategy = self._backup_file(path, local_root, backup_root)
+        os.remove(path)
+
+    async def _remove_matched(
+        self,
+        file_status: FileStatus,
+        executor: ThreadPoolExecutor,
+        roots: tuple[Path, Optional[Path]],
+        result: DiskCleanupResult,
+    ) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                executor,
+                self._remove_file,
+                file_status,
+                *roots,
+            )
+        except OSError as exc:
+            result.errors.append(f"{file_status.local_path}: {exc}")
+            file_status.status = "error"
+            file_status.message = str(exc)
+            result.files.append(file_status)
+            return
+        if file_status.backup_strategy is not None:
+            result.backed_up_files += 1
+        result.deleted_files += 1
+        file_status.status = "deleted"
+        result.files.append(file_status)
 
     async def run(self, local_path: str, backup_path: str | None = None) -> DiskCleanupResult:
         """Run the cleanup flow for a local directory."""
@@ -41,50 +115,17 @@ class DiskCleanupService:
             backup_root.mkdir(parents=True, exist_ok=True)
 
         result = DiskCleanupResult(local_path=str(local_root), backup_path=str(backup_root) if backup_root else None)
-        for path in local_root.rglob("*"):
-            if not path.is_file() or not self._should_include(path):
-                continue
-
-            result.scanned_files += 1
-            file_size = path.stat().st_size
-            try:
-                matches = await self._graph_client.search_file(path.name, str(path))
-            except (OSError, RuntimeError) as exc:
-                result.errors.append(f"{path}: {exc}")
-                result.files.append(
-                    FileStatus(
-                        name=path.name,
-                        local_path=str(path),
-                        status="error",
-                        size=file_size,
-                        message=str(exc),
-                    )
-                )
-                continue
-
-            if matches:
-                if backup_root is not None:
-                    self._backup_file(path, local_root, backup_root)
-                    result.backed_up_files += 1
-                os.remove(path)
-                result.deleted_files += 1
-                result.files.append(
-                    FileStatus(
-                        name=path.name,
-                        local_path=str(path),
-                        cloud_path=matches[0].get("cloud_path"),
-                        size=file_size,
-                        status="deleted",
-                    )
-                )
-            else:
-                result.skipped_files += 1
-                result.files.append(
-                    FileStatus(
-                        name=path.name,
-                        local_path=str(path),
-                        size=file_size,
-                        status="skipped",
-                    )
-                )
+        files: asyncio.Queue[Optional[LocalFile]] = asyncio.Queue(SCAN_QUEUE_SIZE)
+        matched: asyncio.Queue[Optional[FileStatus]] = asyncio.Queue(SCAN_QUEUE_SIZE)
+        match = functools.partial(self._match_file, matched=matched, result=result)
+        with ThreadPoolExecutor(max_workers=CLEANUP_IO_WORKERS) as executor:
+            remove = functools.partial(
+                self._remove_matched,
+                executor=executor,
+                roots=(local_root, backup_root),
+                result=result,
+            )
+            async with worker_pool(matched, remove, CLEANUP_IO_WORKERS):
+                async with worker_pool(files, match, SCAN_CONCURRENCY):
+                    await walk_local_files(local_root, self._should_include, files)
         return result
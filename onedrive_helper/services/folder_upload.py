@@ -5,10 +5,14 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import os
 from pathlib import Path
+from typing import Optional
 
-from onedrive_helper.config import FOLDER_CONCURRENCY
+from onedrive_helper.config import FOLDER_CONCURRENCY, UPLOAD_QUEUE_SIZE
+from onedrive_helper.folder_tree import FolderTreeBuilder
+from onedrive_helper.local_walk import worker_pool
 from onedrive_helper.models import FileStatus, FolderUploadResult
 
 
@@ -30,31 +34,81 @@ class FolderUploadService:
         local_file_path: Path,
         remote_parent_id: str,
         remote_folder_path: str,
-        semaphore: asyncio.Semaphore,
     ) -> FileStatus:
-        async with semaphore:
-            try:
-                response = await self._graph_client.upload_file(str(local_file_path), remote_parent_id)
-                item = response.get("item", {})
-                status = response.get("status", "uploaded")
-                return FileStatus(
-                    name=local_file_path.name,
-                    local_path=str(local_file_path),
-                    cloud_path=item.get("cloud_path")
-                    or self._join_remote_path(remote_folder_path, local_file_path.name),
-                    size=local_file_path.stat().st_size,
-                    status=status,
-                )
-            except (OSError, RuntimeError) as exc:
-                return FileStatus(
-                    name=local_file_path.name,
-                    local_path=str(local_file_path),
-                    size=local_file_path.stat().st_size if local_file_path.exists() else 0,
-                    status="error",
-                    message=str(exc),
+        try:
+            response = await self._graph_client.upload_file(str(local_file_path), remote_parent_id)
+            item = response.get("item", {})
+            status = response.get("status", "uploaded")
+            return FileStatus(
+                name=local_file_path.name,
+                local_path=str(local_file_path),
+                cloud_path=item.get("cloud_path")
+                or self._join_remote_path(remote_folder_path, local_file_path.name),
+                size=local_file_path.stat().st_size,
+                status=status,
+            )
+        except (OSError, RuntimeError) as exc:
+            return FileStatus(
+                name=local_file_path.name,
+                local_path=str(local_file_path),
+                size=local_file_path.stat().st_size if local_file_path.exists() else 0,
+                status="error",
+                message=str(exc),
+            )
+
+    @staticmethod
+    def _accumulate_result(result: FolderUploadResult, file_status: FileStatus) -> None:
+        result.total_files += 1
+        result.files.append(file_status)
+        if file_status.status == "uploaded":
+            result.uploaded_files += 1
+        elif file_status.status == "skipped":
+            result.skipped_files += 1
+        else:
+            result.failed_files += 1
+            if file_status.message:
+                result.errors.append(f"{file_status.local_path}: {file_status.message}")
+
+    async def _upload_job(self, job: tuple[Path, str, str], result: FolderUploadResult) -> None:
+        file_status = await self._upload_single_file(*job)
+        self._accumulate_result(result, file_status)
+
+    @staticmethod
+    def _list_local_folders(local_root: Path) -> list[str]:
+        return [
+            Path(current_root).relative_to(local_root).as_posix()
+            for current_root, _, _ in os.walk(local_root)
+        ]
+
+    async def _walk_local_tree(
+        self,
+        local_root: Path,
+        remote_root_path: str,
+        folder_ids: dict[str, str],
+        queue: asyncio.Queue[Optional[tuple[Path, str, str]]],
+    ) -> None:
+        """Queue every local file with the ID of its already-created remote parent folder."""
+        walker = os.walk(local_root)
+        while (entry := await asyncio.to_thread(next, walker, None)) is not None:
+            current_root, _, file_names = entry
+            current_path = Path(current_root)
+            relative_key = current_path.relative_to(local_root).as_posix()
+            relative_key = "" if relative_key == "." else relative_key
+            if relative_key not in folder_ids:
+                # The folder appeared locally after the remote tree was materialized.
+                folder_ids.update(
+                    await FolderTreeBuilder(self._graph_client).materialize(
+                        folder_ids[""],
+                        [relative_key],
+                    )
                 )
+            parent_id = folder_ids[relative_key]
+            parent_remote_path = self._join_remote_path(remote_root_path, relative_key).rstrip("/")
 
-    async def run(  # pylint: disable=too-many-locals
+            for file_name in sorted(file_names):
+                await queue.put((current_path / file_name, parent_id, parent_remote_path or "/"))
+
+    async def run(
         self,
         local_folder_path: str,
         remote_onedrive_path: str,
@@ -67,36 +121,13 @@ class FolderUploadService:
         remote_root = await self._graph_client.ensure_remote_folder(remote_onedrive_path)
         remote_root_path = self._graph_client.normalize_remote_path(remote_onedrive_path)
         result = FolderUploadResult(local_path=str(local_root), remote_path=remote_root_path)
-        semaphore = asyncio.Semaphore(FOLDER_CONCURRENCY)
-        remote_ids: dict[Path, str] = {Path("."): remote_root["id"]}
-        remote_paths: dict[Path, str] = {Path("."): remote_root_path.rstrip("/") or "/"}
-
-        for current_root, dir_names, file_names in os.walk(local_root):
-            current_path = Path(current_root)
-            relative_path = current_path.relative_to(local_root)
-            relative_key = Path(".") if str(relative_path) == "." else relative_path
-            parent_id = remote_ids[relative_key]
-            parent_remote_path = remote_paths[relative_key]
-
-            for dir_name in sorted(dir_names):
-                child_folder = await self._graph_client.ensure_child_folder(parent_id, dir_name)
-                child_key = relative_key / dir_name
-                remote_ids[child_key] = child_folder["id"]
-                remote_paths[child_key] = (parent_remote_path.rstrip("/") + "/" + dir_name).rstrip("/")
-
-            tasks = [
-                self._upload_single_file(current_path / file_name, parent_id, parent_remote_path, semaphore)
-                for file_name in sorted(file_names)
-            ]
-            for file_status in await asyncio.gather(*tasks):
-                result.total_files += 1
-                result.files.append(file_status)
-                if file_status.status == "uploaded":
-                    result.uploaded_files += 1
-                elif file_status.status == "skipped":
-                    result.skipped_files += 1
-                else:
-                    result.failed_files += 1
-                    if file_status.message:
-                        result.errors.append(f"{file_status.local_path}: {file_status.message}")
+        local_folders = await asyncio.to_thread(self._list_local_folders, local_root)
+        folder_ids = await FolderTreeBuilder(self._graph_client).materialize(
+            remote_root["id"],
+            local_folders,
+        )
+        queue: asyncio.Queue[Optional[tuple[Path, str, str]]] = asyncio.Queue(UPLOAD_QUEUE_SIZE)
+        upload = functools.partial(self._upload_job, result=result)
+        async with worker_pool(queue, upload, FOLDER_CONCURRENCY):
+            await self._walk_local_tree(local_root, remote_root_path, folder_ids, queue)
         return result
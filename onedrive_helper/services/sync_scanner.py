@@ -5,17 +5,23 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import os
 from pathlib import Path
+from typing import Optional
 
-from onedrive_helper.config import FOLDER_CONCURRENCY, VALID_MEDIA_SUFFIXES
+from onedrive_helper.config import SCAN_CONCURRENCY, SCAN_QUEUE_SIZE, VALID_MEDIA_SUFFIXES
+from onedrive_helper.local_walk import LocalFile, walk_local_files, worker_pool
 from onedrive_helper.models import FileStatus, SyncScanReport
 
 
 class SyncScannerService:
     """Scan a local folder and report OneDrive sync status."""
 
-    def __init__(self, graph_client) -> None:
+    def __init__(self, graph_client, drive_index=None, snapshot=None) -> None:
         self._graph_client = graph_client
+        self._drive_index = drive_index
+        self._snapshot = snapshot
 
     @staticmethod
     def _accumulate_result(
@@ -43,42 +49,76 @@ class SyncScannerService:
     async def _scan_single_file(
         self,
         path: Path,
-        semaphore: asyncio.Semaphore,
+        stat_result: os.stat_result,
     ) -> tuple[FileStatus, bool]:
-        async with semaphore:
-            try:
-                matches = await self._graph_client.search_file(path.name, str(path))
-                if matches:
-                    return (
-                        FileStatus(
-                            name=path.name,
-                            local_path=str(path),
-                            cloud_path=matches[0].get("cloud_path"),
-                            size=path.stat().st_size,
-                            status="synced",
-                        ),
-                        True,
-                    )
-                return (
-                    FileStatus(
-                        name=path.name,
-                        local_path=str(path),
-                        size=path.stat().st_size,
-                        status="unsynced",
-                    ),
-                    False,
-                )
-            except (OSError, RuntimeError) as exc:
-                return (
-                    FileStatus(
-                        name=path.name,
-                        local_path=str(path),
-                        size=path.stat().st_size if path.exists() else 0,
-                        status="error",
-                        message=str(exc),
-                    ),
-                    False,
-                )
+        try:
+            matches = await self._graph_client.search_file(
+                path.name,
+                str(path),
+                drive_index=self._drive_index,
+            )
+        except (OSError, RuntimeError) as exc:
+            return (
+                FileStatus(
+                    name=path.name,
+                    local_path=str(path),
+                    size=stat_result.st_size,
+                    status="error",
+                    message=str(exc),
+                ),
+                False,
+            )
+        if matches:
+            return (
+                FileStatus(
+                    name=path.name,
+                    local_path=str(path),
+                    cloud_path=matches[0].get("cloud_path"),
+                    size=stat_result.st_size,
+                    status="synced",
+                ),
+                True,
+            )
+        return (
+            FileStatus(
+                name=path.name,
+                local_path=str(path),
+                size=stat_result.st_size,
+                status="unsynced",
+            ),
+            False,
+        )
+
+    def _reuse_snapshot(self, path: Path, stat_result: os.stat_result, report: SyncScanReport) -> bool:
+        """Count an unchanged, previously synced file from the snapshot without a lookup."""
+        if self._snapshot is None:
+            return False
+        cloud_path = self._snapshot.synced_cloud_path(str(path), stat_result)
+        if cloud_path is None:
+            return False
+        report.reused_files += 1
+        file_status = FileStatus(
+            name=path.name,
+            local_path=str(path),
+            cloud_path=cloud_path or None,
+            size=stat_result.st_size,
+            status="synced",
+        )
+        self._accumulate_result(report, file_status, True)
+        return True
+
+    async def _scan_local_file(self, local_file: LocalFile, report: SyncScanReport) -> None:
+        path, stat_result = local_file
+        if self._reuse_snapshot(path, stat_result, report):
+            return
+        try:
+            file_status, is_synced = await self._scan_single_file(path, stat_result)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            report.errors.append(f"Unexpected scan failure for {path}: {exc}")
+            return
+        self._accumulate_result(report, file_status, is_synced)
+        if self._snapshot is not None and file_status.status != "error":
+            self._snapshot.record(str(path), stat_result, file_status.status, file_status.cloud_path)
 
     async def run(self, local_folder_path: str, include_all: bool = False) -> SyncScanReport:
         """Scan a local folder and summarize synced versus unsynced files."""
@@ -87,29 +127,14 @@ class SyncScannerService:
             raise ValueError(f"Local path does not exist or is not a folder: {local_folder_path}")
 
         report = SyncScanReport(local_path=str(local_root))
-        semaphore = asyncio.Semaphore(FOLDER_CONCURRENCY)
-        pending_tasks: list[tuple[Path, asyncio.Task[tuple[FileStatus, bool]]]] = []
-
-        async def process_batch() -> None:
-            results = await asyncio.gather(
-                *(task for _, task in pending_tasks),
-                return_exceptions=True,
+        queue: asyncio.Queue[Optional[LocalFile]] = asyncio.Queue(SCAN_QUEUE_SIZE)
+        scan = functools.partial(self._scan_local_file, report=report)
+        async with worker_pool(queue, scan, SCAN_CONCURRENCY):
+            await walk_local_files(
+                local_root,
+                functools.partial(self._should_include, include_all=include_all),
+                queue,
             )
-            for (path, _), result in zip(pending_tasks, results):
-                if isinstance(result, BaseException):
-                    report.errors.append(f"Unexpected scan failure for {path}: {result}")
-                    continue
-                file_status, is_synced = result
-                self._accumulate_result(report, file_status, is_synced)
-            pending_tasks.clear()
-
-        for path in local_root.rglob("*"):
-            if not path.is_file() or not self._should_include(path, include_all):
-                continue
-            pending_tasks.append((path, asyncio.create_task(self._scan_single_file(path, semaphore))))
-            if len(pending_tasks) >= FOLDER_CONCURRENCY:
-                await process_batch()
-
-        if pending_tasks:
-            await process_batch()
+        if self._snapshot is not None:
+            self._snapshot.finish(str(local_root))
         return report
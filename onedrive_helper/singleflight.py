@@ -0,0 +1,54 @@
+"""Share one in-flight call between concurrent callers that ask for the same thing."""
+
+# pylint: disable=too-few-public-methods
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into a single execution.
+
+    The first caller for a key starts the call; callers arriving while it is still
+    running await the same result or exception. Keys are forgotten as soon as the
+    call finishes, so later callers always start a fresh call. A caller that is
+    cancelled does not cancel the shared call for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, tuple[asyncio.Future[Any], list[int]]] = {}
+
+    async def run(
+        self,
+        key: Hashable,
+        call: Callable[[], Awaitable[Any]],
+        *,
+        copy_result: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """Return the result of ``call()``, joining an identical call already in flight.
+
+        With ``copy_result``, every caller of a shared call gets its own copy of the
+        result, so callers that modify it cannot see each other's changes.
+        """
+        entry = self._calls.get(key)
+        if entry is None:
+            future = asyncio.ensure_future(call())
+            entry = self._calls[key] = (future, [0])
+            future.add_done_callback(lambda done: self._finish(key, done))
+        future, callers = entry
+        callers[0] += 1
+        result = await asyncio.shield(future)
+        # The key is forgotten before any caller resumes, so the count is final here.
+        if copy_result is not None and callers[0] > 1:
+            return copy_result(result)
+        return result
+
+    def _finish(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        entry = self._calls.get(key)
+        if entry is not None and entry[0] is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Mark the exception retrieved even if every waiting caller was cancelled.
+            future.exception()
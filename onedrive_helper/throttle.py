@@ -0,0 +1,104 @@
+"""Client-wide adaptive concurrency control driven by Graph throttling signals."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from onedrive_helper.config import (
+    CONCURRENCY_DECREASE_FACTOR,
+    CONCURRENCY_MAX,
+    CONCURRENCY_MIN,
+    FOLDER_CONCURRENCY,
+)
+
+
+class AdaptiveConcurrencyController:
+    """Limit in-flight requests with additive-increase, multiplicative-decrease (AIMD).
+
+    Every healthy response raises the limit by ``1 / limit``, so the limit grows by
+    about one per round of requests. A throttling response pauses all new requests
+    until its ``Retry-After`` window has passed and cuts the limit by
+    ``CONCURRENCY_DECREASE_FACTOR``, once per throttling episode.
+    """
+
+    def __init__(
+        self,
+        initial: int = FOLDER_CONCURRENCY,
+        minimum: int = CONCURRENCY_MIN,
+        maximum: int = CONCURRENCY_MAX,
+    ) -> None:
+        self._minimum = minimum
+        self._maximum = maximum
+        self._limit = float(max(minimum, min(maximum, initial)))
+        self._in_flight = 0
+        self._resume_at = 0.0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one request slot for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self) -> None:
+        """Wait for any throttling pause to end and for a free slot."""
+        while True:
+            pause = self._resume_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if not waiter.cancel():
+                    # This caller was already woken for a free slot; pass the wake-up on.
+                    self._wake_waiters()
+                raise
+
+    def release(self) -> None:
+        """Return a slot and wake waiters that now fit under the limit."""
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        free_slots = self.limit - self._in_flight
+        while free_slots > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
+
+    def on_success(self) -> None:
+        """Grow the limit additively after a healthy response."""
+        self._limit = min(self._maximum, self._limit + 1 / self._limit)
+        self._wake_waiters()
+
+    def on_throttle(self, retry_after: float) -> None:
+        """Pause every new request for ``retry_after`` seconds and shrink the limit."""
+        now = time.monotonic()
+        if now >= self._resume_at:
+            # Responses from the same burst arrive together; only cut once per episode.
+            self._limit = max(self._minimum, self._limit * CONCURRENCY_DECREASE_FACTOR)
+        self._resume_at = max(self._resume_at, now + retry_after)
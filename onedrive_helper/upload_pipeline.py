@@ -0,0 +1,194 @@
+"""Helpers that keep disk reads and network sends overlapped during chunked uploads."""
+
+# pylint: disable=too-few-public-methods
+
+from __future__ import annotations
+
+import asyncio
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterator, Optional, Union
+
+from onedrive_helper.config import (
+    SMALL_FILE_UPLOAD_BYTES,
+    UPLOAD_CHUNK_MAX,
+    UPLOAD_CHUNK_MIN,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_CHUNK_TARGET_SECONDS,
+    UPLOAD_CHUNK_UNIT,
+)
+
+
+class AdaptiveChunkSizer:
+    """Pick upload chunk sizes so each PUT takes roughly a target number of seconds.
+
+    Sizes are always multiples of ``UPLOAD_CHUNK_UNIT`` as required by Graph upload
+    sessions, and change by at most a factor of two per measurement.
+    """
+
+    def __init__(
+        self,
+        initial: int = UPLOAD_CHUNK_SIZE,
+        target_seconds: float = UPLOAD_CHUNK_TARGET_SECONDS,
+    ) -> None:
+        self.size = self._clamp(initial)
+        self._target_seconds = target_seconds
+
+    @staticmethod
+    def _clamp(size: int) -> int:
+        size = max(UPLOAD_CHUNK_MIN, min(UPLOAD_CHUNK_MAX, size))
+        return size - size % UPLOAD_CHUNK_UNIT
+
+    def record(self, sent_bytes: int, elapsed_seconds: float) -> None:
+        """Adjust the chunk size from one measured full-size PUT."""
+        if elapsed_seconds <= 0:
+            return
+        ideal = int(sent_bytes / elapsed_seconds * self._target_seconds)
+        self.size = self._clamp(max(self.size // 2, min(self.size * 2, ideal)))
+
+
+class ReadBufferPool:
+    """Hand the read buffers of finished small-file uploads on to the next ones.
+
+    Files of ``keep_bytes`` or more get buffers of their own, so upload sessions
+    do not pin chunk-sized buffers for the rest of the run.
+    """
+
+    def __init__(self, keep_bytes: int = SMALL_FILE_UPLOAD_BYTES) -> None:
+        self._keep_bytes = keep_bytes
+        self._idle: list[list[bytearray]] = []
+
+    @contextmanager
+    def borrow(self, file_size: int) -> Iterator[list[bytearray]]:
+        """Lend a pair of read buffers for the upload of a ``file_size``-byte file."""
+        if file_size >= self._keep_bytes:
+            yield [bytearray(), bytearray()]
+            return
+        buffers = self._idle.pop() if self._idle else [bytearray(), bytearray()]
+        try:
+            yield buffers
+        finally:
+            self._idle.append(buffers)
+
+
+class ChunkReader:  # pylint: disable=too-many-instance-attributes
+    """Produce successive file chunks in a worker thread, one chunk ahead of the sender.
+
+    Chunks are read into two buffers in turn, so the chunk being sent and the one
+    being read never share memory; pass ``buffers`` from a ``ReadBufferPool`` to
+    keep them across files. With ``use_mmap`` the file is
+    memory-mapped instead and chunks are zero-copy slices of the page cache; only
+    use that for files nothing else writes to, because a file that is truncated
+    while mapped kills the process with ``SIGBUS``. Every chunk also feeds the
+    given hashers, so the digests of the uploaded bytes are known without a
+    second read.
+    """
+
+    def __init__(
+        self,
+        file_handle: BinaryIO,
+        hashers: Optional[dict[str, Any]] = None,
+        *,
+        buffers: Optional[list[bytearray]] = None,
+        use_mmap: bool = False,
+    ) -> None:
+        self._file_handle = file_handle
+        self._hashers = hashers or {}
+        self._pending: Optional[asyncio.Task[Union[bytes, memoryview]]] = None
+        self._offset = 0
+        self._sent_chunk: Optional[tuple[int, memoryview]] = None
+        self._buffers = buffers if buffers is not None else [bytearray(), bytearray()]
+        self._mapped: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        if not use_mmap:
+            return
+        try:
+            self._mapped = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mapped)
+        except (OSError, ValueError):
+            # Empty files and non-mappable handles use plain reads.
+            self._mapped = None
+
+    def _release_sent_chunk(self) -> None:
+        """Drop the last handed-out slice and its pages once it has been sent."""
+        if self._sent_chunk is None:
+            return
+        (start, sent_chunk), self._sent_chunk = self._sent_chunk, None
+        self._advise("MADV_DONTNEED", start, len(sent_chunk))
+        try:
+            sent_chunk.release()
+        except BufferError:
+            pass
+
+    def _advise(self, advice_name: str, start: int, length: int) -> None:
+        advice = getattr(mmap, advice_name, None)
+        if self._mapped is None or advice is None or length <= 0:
+            return
+        page_start = start - start % mmap.PAGESIZE
+        self._mapped.madvise(advice, page_start, length + start - page_start)
+
+    def _read(self, size: int) -> memoryview:
+        if self._offset:
+            # Swap buffers so the previous chunk stays intact while it is on the wire.
+            self._buffers.reverse()
+        if len(self._buffers[0]) < size:
+            # A fresh buffer, because one with exported views cannot be resized.
+            self._buffers[0] = bytearray(size)
+        view = memoryview(self._buffers[0])[:size]
+        read = self._file_handle.readinto(view) or 0
+        self._offset += read
+        return view[:read]
+
+    def _load(self, size: int) -> Union[bytes, memoryview]:
+        if self._view is None:
+            chunk: Union[bytes, memoryview] = self._read(size)
+        else:
+            start = self._offset
+            if os.fstat(self._file_handle.fileno()).st_size < min(start + size, len(self._view)):
+                # Pages past the new end of file would raise SIGBUS when touched.
+                raise OSError("File shrank while it was being uploaded.")
+            chunk = self._view[start : start + size]
+            self._offset += len(chunk)
+            self._advise("MADV_WILLNEED", start, len(chunk))
+            # Touch one byte per page so page faults happen here, not on the event loop.
+            bytes(chunk[:: mmap.PAGESIZE])
+        for hasher in self._hashers.values():
+            hasher.update(chunk)
+        return chunk
+
+    def hexdigests(self) -> dict[str, str]:
+        """Return the digests of every byte loaded so far, keyed by hash type."""
+        return {hash_type: hasher.hexdigest() for hash_type, hasher in self._hashers.items()}
+
+    def prefetch(self, size: int) -> None:
+        """Start loading the next chunk in the background."""
+        self._pending = asyncio.create_task(asyncio.to_thread(self._load, size))
+
+    async def next_chunk(self) -> Union[bytes, memoryview]:
+        """Return the prefetched chunk and drop the previously sent one from memory."""
+        if self._pending is None:
+            raise RuntimeError("No chunk was prefetched.")
+        pending, self._pending = self._pending, None
+        chunk = await pending
+        self._release_sent_chunk()
+        if isinstance(chunk, memoryview):
+            self._sent_chunk = (self._offset - len(chunk), chunk)
+        return chunk
+
+    async def aclose(self) -> None:
+        """Wait for an outstanding load and release the mapping."""
+        if self._pending is not None:
+            await asyncio.gather(self._pending, return_exceptions=True)
+            self._pending = None
+        self._release_sent_chunk()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mapped is not None:
+            try:
+                self._mapped.close()
+            except BufferError:
+                # A sent slice is still referenced; the mapping closes once it is collected.
+                pass
+            self._mapped = None
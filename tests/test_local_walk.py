@@ -0,0 +1,43 @@
+"""Tests for the local folder walk and its worker pool."""
+
+import asyncio
+import unittest
+
+from onedrive_helper.local_walk import worker_pool
+
+
+class WorkerPoolTest(unittest.IsolatedAsyncioTestCase):
+    """Check that the pool drains its queue and fails fast."""
+
+    async def test_handles_every_job(self) -> None:
+        """Every job queued inside the block is handled before it exits."""
+        handled = []
+        queue: asyncio.Queue = asyncio.Queue(4)
+
+        async def handle(job: int) -> None:
+            await asyncio.sleep(0)
+            handled.append(job)
+
+        async with worker_pool(queue, handle, 2):
+            for job in range(20):
+                await queue.put(job)
+        self.assertEqual(sorted(handled), list(range(20)))
+
+    async def test_reraises_handler_error(self) -> None:
+        """A raising handler stops the producer instead of leaving it blocked on a full queue."""
+        queue: asyncio.Queue = asyncio.Queue(4)
+
+        async def handle(job: int) -> None:
+            raise ValueError(f"job {job} failed")
+
+        async def produce() -> None:
+            async with worker_pool(queue, handle, 2):
+                for job in range(100):
+                    await queue.put(job)
+
+        with self.assertRaisesRegex(ValueError, "job 0 failed"):
+            await asyncio.wait_for(produce(), timeout=5)
+
+
+if __name__ == "__main__":
+    unittest.main()